@@ -1,13 +1,14 @@
 from resources.structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
 from resources.exceptions import Error, UserNotVerified, Message, BloxlinkBypass, CancelCommand, PermissionError, Blacklisted # pylint: disable=import-error, no-name-in-module
 from config import REACTIONS # pylint: disable=import-error, no-name-in-module
-from resources.constants import RELEASE # pylint: disable=import-error, no-name-in-module
+from resources.constants import RELEASE, REQUEST_PRIORITY, FREE_ROLE_SCAN_MEMBERS # pylint: disable=import-error, no-name-in-module
 from discord import User
 from discord.errors import NotFound
 import math
 
 guild_obligations, format_update_embed = Bloxlink.get_module("roblox", attrs=["guild_obligations", "format_update_embed"])
 has_premium = Bloxlink.get_module("premium", attrs="has_premium")
+fetch_role_members, evict_members = Bloxlink.get_module("utils", attrs=["fetch_role_members", "evict_members"])
 
 
 class UpdateCommand(Bloxlink.Module):
@@ -40,6 +41,44 @@ class UpdateCommand(Bloxlink.Module):
         self.slash_defer = True
         self.slash_only = True
 
+    @staticmethod
+    async def check_premium(guild, author):
+        """checks if the server, or the author, has premium"""
+
+        donator_profile = await has_premium(guild=guild)
+
+        if "premium" in donator_profile.features:
+            return True
+
+        donator_profile = await has_premium(user=author)
+
+        return "premium" in donator_profile.features
+
+    async def check_cooldown(self, redis_cooldown_key):
+        """raises if the server already has a mass update queued, running, or cooling down"""
+
+        if not self.redis:
+            return
+
+        on_cooldown = await self.redis.get(redis_cooldown_key)
+
+        if on_cooldown:
+            cooldown_time = math.ceil(await self.redis.ttl(redis_cooldown_key)/60)
+
+            if not cooldown_time or cooldown_time == -1:
+                await self.redis.delete(redis_cooldown_key)
+                on_cooldown = None
+
+            if on_cooldown:
+                if on_cooldown == 1:
+                    raise Message(f"This server is still queued.")
+                elif on_cooldown == 2:
+                    raise Message("This server's scan is currently running.")
+                elif on_cooldown == 3:
+                    cooldown_time = math.ceil(await self.redis.ttl(redis_cooldown_key)/60)
+
+                    raise Message(f"This server has an ongoing cooldown! You must wait **{cooldown_time}** more minutes.")
+
     async def __main__(self, CommandArgs):
         response = CommandArgs.response
         command  = CommandArgs.command
@@ -61,13 +100,25 @@ class UpdateCommand(Bloxlink.Module):
                 raise Message("You do not have permission to update users; you need the `Manage Roles` permission, or "
                               "a role called `Bloxlink Updater`.", type="info", hidden=True)
 
-        if not guild.chunked:
-            await guild.chunk()
+        redis_cooldown_key = self.REDIS_COOLDOWN_KEY.format(release=RELEASE, id=guild.id)
+        premium = None
 
         if users_[1]:
             role = users_[1]
 
-            users += role.members
+            # everything that can refuse the update is checked before paging through the member
+            # list, which costs a request per 1000 members
+            await self.check_cooldown(redis_cooldown_key)
+
+            premium = await self.check_premium(guild, author)
+
+            if not premium and not guild.chunked and (guild.member_count or 0) > FREE_ROLE_SCAN_MEMBERS:
+                raise Error(f"You need premium in order to update a role in servers with more than {FREE_ROLE_SCAN_MEMBERS:,} members! "
+                            f"Use `/donate` for instructions on donating.")
+
+            # without premium, finding an 11th member is enough to refuse the update
+            async for member in fetch_role_members(guild, role, limit=None if premium else 11):
+                users.append(member)
 
             if not users:
                 raise Error("This role has no members in it!", hidden=True)
@@ -88,32 +139,8 @@ class UpdateCommand(Bloxlink.Module):
                     users[i] = user
 
         if self.redis:
-            redis_cooldown_key = self.REDIS_COOLDOWN_KEY.format(release=RELEASE, id=guild.id)
-            on_cooldown = await self.redis.get(redis_cooldown_key)
-
-            if len_users > 3 and on_cooldown:
-                cooldown_time = math.ceil(await self.redis.ttl(redis_cooldown_key)/60)
-
-                if not cooldown_time or cooldown_time == -1:
-                    await self.redis.delete(redis_cooldown_key)
-                    on_cooldown = None
-
-                if on_cooldown:
-                    if on_cooldown == 1:
-                        raise Message(f"This server is still queued.")
-                    elif on_cooldown == 2:
-                        raise Message("This server's scan is currently running.")
-                    elif on_cooldown == 3:
-                        cooldown_time = math.ceil(await self.redis.ttl(redis_cooldown_key)/60)
-
-                        raise Message(f"This server has an ongoing cooldown! You must wait **{cooldown_time}** more minutes.")
-
-            donator_profile = await has_premium(guild=guild)
-            premium = "premium" in donator_profile.features
-
-            if not premium:
-                donator_profile = await has_premium(user=author)
-                premium = "premium" in donator_profile.features
+            if premium is None:
+                premium = await self.check_premium(guild, author)
 
             cooldown = 0
 
@@ -134,33 +161,41 @@ class UpdateCommand(Bloxlink.Module):
             if len_users > 1:
                 await response.send(f"Updating **{len_users}** users...")
 
-                for user in users:
-                    if not user.bot:
-                        try:
-                            added, removed, nickname, errors, warnings, roblox_user, _ = await guild_obligations(
-                                user,
-                                guild             = guild,
-                                roles             = True,
-                                nickname          = True,
-                                dm                = False,
-                                exceptions        = ("BloxlinkBypass", "UserNotVerified", "Blacklisted", "PermissionError", "RobloxDown"),
-                                cache             = False)
-                        except BloxlinkBypass:
-                            if len_users <= 10:
-                                await response.info(f"{user.mention} **bypassed**")
-                        except UserNotVerified:
-                            if len_users <= 10:
-                                await response.send(f"{REACTIONS['ERROR']} {user.mention} is **not linked to Bloxlink**")
-                        except PermissionError as e:
-                            raise Error(e.message)
-                        except Blacklisted as b:
-                            if len_users <= 10:
-                                await response.send(f"{REACTIONS['ERROR']} {user.mention} has an active restriction.")
-                        except CancelCommand:
-                            pass
-                        else:
-                            if len_users <= 10:
-                                await response.send(f"{REACTIONS['DONE']} **Updated** {user.mention}")
+                # members that weren't cached before the scan shouldn't stay resident after it
+                temp_cached = {user.id for user in users if not guild.get_member(user.id)}
+
+                try:
+                    for user in users:
+                        if not user.bot:
+                            try:
+                                added, removed, nickname, errors, warnings, roblox_user, _ = await guild_obligations(
+                                    user,
+                                    guild             = guild,
+                                    roles             = True,
+                                    nickname          = True,
+                                    dm                = False,
+                                    exceptions        = ("BloxlinkBypass", "UserNotVerified", "Blacklisted", "PermissionError", "RobloxDown"),
+                                    cache             = False,
+                                    priority          = REQUEST_PRIORITY["BULK"])
+                            except BloxlinkBypass:
+                                if len_users <= 10:
+                                    await response.info(f"{user.mention} **bypassed**")
+                            except UserNotVerified:
+                                if len_users <= 10:
+                                    await response.send(f"{REACTIONS['ERROR']} {user.mention} is **not linked to Bloxlink**")
+                            except PermissionError as e:
+                                raise Error(e.message)
+                            except Blacklisted as b:
+                                if len_users <= 10:
+                                    await response.send(f"{REACTIONS['ERROR']} {user.mention} has an active restriction.")
+                            except CancelCommand:
+                                pass
+                            else:
+                                if len_users <= 10:
+                                    await response.send(f"{REACTIONS['DONE']} **Updated** {user.mention}")
+                finally:
+                    evict_members(guild, temp_cached)
+
             else:
                 user = users[0]
 
@@ -4,7 +4,8 @@ import asyncio
 import logging
 import signal
 import os
-from resources.constants import MODULE_DIR # pylint: disable=import-error, no-name-in-module
+import time
+from resources.constants import MODULE_DIR, STARTUP_REPORT_TIMEOUT, STARTUP_REPORT_SIZE # pylint: disable=import-error, no-name-in-module
 from resources.structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
 from resources.secrets import TOKEN # , SENTRY_URL, VALID_SECRETS # pylint: disable=import-error, no-name-in-module
 
@@ -16,13 +17,33 @@ discord.http._set_api_version(9)
 
 async def register_modules():
     get_files = Bloxlink.get_module("utils", attrs="get_files")
+    started = time.perf_counter()
 
     for directory in MODULE_DIR: # pylint: disable=E1101
         files = get_files(directory)
 
         for filename in [f.replace(".py", "") for f in files]:
+            module_started = time.perf_counter()
+
             Bloxlink.get_module(path=directory, dir_name=filename)
 
+            Bloxlink.startup_timings[f"{directory}/{filename}"] = time.perf_counter() - module_started
+
+    Bloxlink.log(f"Imported modules in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    # __setup__ coroutines run concurrently once we yield to the loop; report them when they're done
+    asyncio.create_task(report_startup_timings())
+
+async def report_startup_timings():
+    setup_tasks = [asyncio.wrap_future(t) for t in Bloxlink.setup_tasks.values()]
+
+    # some __setup__s are long-running listeners, so only wait a bit for the rest
+    if setup_tasks:
+        await asyncio.wait(setup_tasks, timeout=STARTUP_REPORT_TIMEOUT)
+
+    for name, duration in sorted(Bloxlink.startup_timings.items(), key=lambda t: t[1], reverse=True)[:STARTUP_REPORT_SIZE]:
+        Bloxlink.log(f"Startup | {name}: {duration * 1000:.1f}ms")
+
 """
 def load_sentry():
     from resources.constants import RELEASE # pylint: disable=import-error, no-name-in-module
@@ -57,6 +78,14 @@ def load_sentry():
 """
 
 
+async def shutdown():
+    flush_writes = Bloxlink.get_module("cache", attrs=["flush_writes"])
+
+    try:
+        await flush_writes()
+    finally:
+        await Bloxlink.close()
+
 async def handle_signal(sig):
     """handle the Unix SIGINT and SIGTERM signals.
        `SystemExit`s are incorrectly caught, so we have to use
@@ -66,7 +95,7 @@ async def handle_signal(sig):
 
     loop = asyncio.get_event_loop()
 
-    await Bloxlink.close()
+    await shutdown()
 
     loop.stop()
 
@@ -100,5 +129,5 @@ if __name__ == "__main__":
     try:
         loop.run_until_complete(main())
     finally:
-        loop.run_until_complete(Bloxlink.close())
+        loop.run_until_complete(shutdown())
         loop.close()
@@ -1,4 +1,4 @@
-from resources.structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+from resources.structures import Bloxlink, InteractionPaginator # pylint: disable=import-error, no-name-in-module
 from resources.exceptions import RobloxNotFound, Error, RobloxAPIError, Message # pylint: disable=import-error, no-name-in-module
 from resources.constants import LIMITS # pylint: disable=import-error, no-name-in-module
 from discord import Embed
@@ -8,6 +8,7 @@ import re
 get_group, get_user = Bloxlink.get_module("roblox", attrs=["get_group", "get_user"])
 has_premium = Bloxlink.get_module("premium", attrs=["has_premium"])
 set_guild_value, get_guild_value = Bloxlink.get_module("cache", attrs=["set_guild_value", "get_guild_value"])
+clear_restrictions = Bloxlink.get_module("blacklist", attrs=["clear_restrictions"])
 
 
 RESTRICTION_NAME_DB_USER_MAP = {
@@ -196,6 +197,7 @@ class RestrictCommand(Bloxlink.Module):
 
 
         await set_guild_value(guild, restrictions=restrictions)
+        clear_restrictions(guild)
 
         await response.success(f"Successfully **updated** your restrictions!")
 
@@ -211,13 +213,25 @@ class RestrictCommand(Bloxlink.Module):
         if not restrictions:
             return await response.silly("You have no restrictions!")
 
-        embed = Embed(title=f"Server Restrictions for {guild.name}", description="These members will not be able to verify in your server!")
+        def restriction_fields(restriction_data):
+            async def fields():
+                for x, y in restriction_data.items():
+                    yield ("**" + y['name'] + '** (' + x + ')', 'Reason: ' + str(y['reason']) + ' | Added by: ' + (f'<@{y["addedBy"]}>' if y['addedBy'] else str(y['addedBy'])))
 
-        for restriction_type, restriction_data in restrictions.items():
-            if restriction_data:
-                embed.add_field(name=RESTRICTION_NAME_DB_USER_MAP[restriction_type], value="\n".join(["**" + y['name'] + '** (' + x + ')' + ' | Reason: ' + str(y['reason']) + ' | Added by: ' + (f'<@{y["addedBy"]}>' if y['addedBy'] else y['addedBy']) for x,y in restriction_data.items()]))
+            return fields
 
-        await response.send(embed=embed)
+        restriction_categories = {RESTRICTION_NAME_DB_USER_MAP[restriction_type]: restriction_fields(restriction_data)
+                                  for restriction_type, restriction_data in restrictions.items() if restriction_data}
+
+        if not restriction_categories:
+            return await response.silly("You have no restrictions!")
+
+        embed = Embed(title=f"Server Restrictions for {guild.name}")
+
+        paginator = InteractionPaginator(restriction_categories, response, embed=embed, max_items=10,
+                                         description="These members will not be able to verify in your server!")
+
+        await paginator()
 
 
     @Bloxlink.subcommand(arguments=[
@@ -254,6 +268,7 @@ class RestrictCommand(Bloxlink.Module):
                     restrictions = None
 
                 await set_guild_value(guild, restrictions=restrictions)
+                clear_restrictions(guild)
 
                 await response.success(f"Successfully **removed** this **{directory_name[:-1]}** from your restrictions.")
 
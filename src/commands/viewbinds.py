@@ -1,9 +1,11 @@
-from resources.structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+from resources.structures import Bloxlink, InteractionPaginator # pylint: disable=import-error, no-name-in-module
 from discord import Embed
 from resources.exceptions import Message, RobloxNotFound # pylint: disable=import-error, no-name-in-module
-from resources.constants import ARROW # pylint: disable=import-error, no-name-in-module
+from resources.constants import ARROW, GROUP_RESOLVE_CONCURRENCY # pylint: disable=import-error, no-name-in-module
+import asyncio
 
 get_binds, get_group, count_binds = Bloxlink.get_module("roblox", attrs=["get_binds", "get_group", "count_binds"])
+get_guild_value, set_guild_value = Bloxlink.get_module("cache", attrs=["get_guild_value", "set_guild_value"])
 
 
 @Bloxlink.command
@@ -15,8 +17,44 @@ class ViewBindsCommand(Bloxlink.Module):
         self.aliases = ["binds", "view-binds"]
         self.slash_enabled = True
 
+    @staticmethod
+    async def resolve_group_names(guild, group_ids):
+        """resolves the names of group_ids concurrently and saves them into the bind
+        documents, so later views don't need to look them up again"""
+
+        semaphore = asyncio.Semaphore(GROUP_RESOLVE_CONCURRENCY)
+
+        async def resolve(group_id):
+            async with semaphore:
+                try:
+                    return group_id, (await get_group(group_id, full_group=True)).name
+                except RobloxNotFound:
+                    return group_id, None
+
+        group_names = dict(await asyncio.gather(*[resolve(group_id) for group_id in group_ids]))
+
+        role_binds = await get_guild_value(guild, "roleBinds") or {}
+        linked_groups = await get_guild_value(guild, "groupIDs") or {}
+        changes = {}
+
+        for group_id, group_data in role_binds.get("groups", {}).items():
+            if not group_data.get("groupName") and group_names.get(group_id):
+                group_data["groupName"] = group_names[group_id]
+                changes["roleBinds"] = role_binds
+
+        for group_id, group_data in linked_groups.items():
+            if not group_data.get("groupName") and group_names.get(group_id):
+                group_data["groupName"] = group_names[group_id]
+                changes["groupIDs"] = linked_groups
+
+        if changes:
+            await set_guild_value(guild, **changes)
+
+        return group_names
+
     async def __main__(self, CommandArgs):
         guild = CommandArgs.guild
+        response = CommandArgs.response
 
         role_binds, group_ids = await get_binds(guild)
 
@@ -24,193 +62,115 @@ class ViewBindsCommand(Bloxlink.Module):
             raise Message("You have no bounded roles! Please use `/bind` "
                            "to make a new role bind.", type="silly")
 
-        embed = Embed(title="Bloxlink Role Binds")
+        unresolved_groups = {group_id for group_id, group_data in (*group_ids.items(), *role_binds["groups"].items()) if not group_data.get("groupName")}
+        group_names = await self.resolve_group_names(guild, unresolved_groups) if unresolved_groups else {}
 
-        text = []
-        if group_ids:
-            for group_id, group_data in group_ids.items():
-              text.append(f"**Group:** {group_data.get('groupName', '')} ({group_id}) {ARROW} **Nickname:** {group_data['nickname']}")
-
-            text = "\n".join(text)
-
-            embed.add_field(name="Linked Groups", value=text, inline=False)
-
-        if role_binds:
-            role_cache = {}
-
-            for category, bind_data in role_binds.items():
-                if category == "groups":
-                    for group_id, group_data in bind_data.items():
-                        text = []
-                        for rank_id, rank_data in group_data.get("binds", {}).items():
-                            role_names = set()
-
-                            if rank_data.get("roles"):
-                                for role_ in rank_data["roles"]:
-                                    role_cache_find = role_cache.get(role_)
-
-                                    if role_cache_find:
-                                        role_names.add(role_cache_find)
-                                    else:
-                                        for role in guild.roles:
-                                            if role_ in (role.name, str(role.id)):
-                                                role_names.add(role.name)
-                                                role_cache[role_] = role.name
-
-                                                break
-                                        else:
-                                            try:
-                                                int(role_)
-                                            except ValueError:
-                                                role_names.add(role_)
-                                                role_cache[role_] = role_
-                                            else:
-                                                # deleted role
-                                                # TODO: check if the role is saved in server settings, then delete it
-                                                role_names.add("(Deleted Role(s))")
-                                                role_cache[role_] = "(Deleted Role(s))"
-
-                                if rank_id in ("guest", "0"):
-                                    text.append(f"**Rank:** (Guest Role) {ARROW} **Roles:** {', '.join(role_names)} {ARROW} **Nickname:** {rank_data['nickname']}")
-                                else:
-                                    text.append(f"**Rank:** {rank_id} {ARROW} **Roles:** {', '.join(role_names)} {ARROW} **Nickname:** {rank_data['nickname']}")
-                            else:
-                                text.append(f"**Rank:** {rank_id} {ARROW} **Roles:** (Dynamic Roles) {ARROW} **Nickname:** {rank_data['nickname']}")
-
-                        for range_data in group_data.get("ranges", []):
-                            role_names = set()
-
-                            if range_data["roles"]:
-                                for role_ in range_data["roles"]:
-                                    role_cache_find = role_cache.get(role_)
-
-                                    if role_cache_find:
-                                        role_names.add(role_cache_find)
-                                    else:
-                                        for role in guild.roles:
-                                            if role_ in (role.name, str(role.id)):
-                                                role_names.add(role.name)
-                                                role_cache[role_] = role.name
-
-                                                break
-                                        else:
-                                            try:
-                                                int(role_)
-                                            except ValueError:
-                                                role_names.add(role_)
-                                                role_cache[role_] = role_
-                                            else:
-                                                # deleted role
-                                                # TODO: check if the role is saved in server settings, then delete it
-                                                role_names.add("(Deleted Role(s))")
-                                                role_cache[role_] = "(Deleted Role(s))"
-
-                                text.append(f"**Rank Range:** {range_data['low']} - {range_data['high']} {ARROW} **Roles:** {', '.join(role_names)} {ARROW} **Nickname:** {range_data['nickname']}")
-                            else:
-                                text.append(f"**Rank Range:** {range_data['low']} - {range_data['high']} {ARROW} **Roles:** (Dynamic Roles) {ARROW} **Nickname:** {range_data['nickname']}")
-
-                        if text:
-                            text = "\n".join(text)
-
-                            try:
-                                group_name = group_data.get("groupName") or (await get_group(group_id, full_group=True)).name
-                            except RobloxNotFound:
-                                # TODO: remove group
-                                pass
-                            else:
-                                embed.add_field(name=f"{group_name} ({group_id})", value=text, inline=False)
+        role_cache = {}
+
+        def get_role_names(roles):
+            role_names = set()
+
+            for role_ in roles:
+                role_cache_find = role_cache.get(role_)
 
+                if role_cache_find:
+                    role_names.add(role_cache_find)
                 else:
-                    text = []
-
-                    if category == "gamePasses":
-                        category_non_plural = "gamePass"
-                        category_non_plural_title = "GamePass"
-                        category_title = "GamePasses"
-                    elif category == "devForum":
-                        category_title = "DevForum Members"
-                    elif category == "robloxStaff":
-                        category_title = "Roblox Staff"
+                    for role in guild.roles:
+                        if role_ in (role.name, str(role.id)):
+                            role_names.add(role.name)
+                            role_cache[role_] = role.name
+
+                            break
                     else:
-                        category_non_plural = category[:-1]
-                        category_non_plural_title = category_non_plural.title()
-                        category_title = category.title()
-
-                    if category in ("devForum", "robloxStaff"):
-                        role_names = set()
-
-                        if bind_data["roles"]:
-                            for role_ in bind_data["roles"]:
-                                role_cache_find = role_cache.get(role_)
-
-                                if role_cache_find:
-                                    role_names.add(role_cache_find)
-                                else:
-                                    for role in guild.roles:
-                                        if role_ in (role.name, str(role.id)):
-                                            role_names.add(role.name)
-                                            role_cache[role_] = role.name
-
-                                            break
-                                    else:
-                                        try:
-                                            int(role_)
-                                        except ValueError:
-                                            role_names.add(role_)
-                                            role_cache[role_] = role_
-                                        else:
-                                            # deleted role
-                                            # TODO: check if the role is saved in server settings, then delete it
-                                            role_names.add("(Deleted Role(s))")
-                                            role_cache[role_] = "(Deleted Role(s))"
-
-                            text.append(f"**Roles:** {', '.join(role_names)} {ARROW} **Nickname:** {bind_data['nickname']}")
+                        try:
+                            int(role_)
+                        except ValueError:
+                            role_names.add(role_)
+                            role_cache[role_] = role_
+                        else:
+                            # deleted role
+                            # TODO: check if the role is saved in server settings, then delete it
+                            role_names.add("(Deleted Role(s))")
+                            role_cache[role_] = "(Deleted Role(s))"
+
+            return ", ".join(role_names)
+
+        async def linked_groups():
+            for group_id, group_data in group_ids.items():
+                yield f"**Group:** {group_data.get('groupName') or group_names.get(group_id) or ''} ({group_id}) {ARROW} **Nickname:** {group_data['nickname']}"
+
+        async def group_binds():
+            for group_id, group_data in role_binds["groups"].items():
+                group_name = group_data.get("groupName") or group_names.get(group_id)
+
+                if not group_name:
+                    # TODO: remove groups that no longer exist
+                    continue
 
+                group_text = f"**Group:** {group_name} ({group_id})"
+
+                for rank_id, rank_data in group_data.get("binds", {}).items():
+                    if rank_data.get("roles"):
+                        if rank_id in ("guest", "0"):
+                            yield f"{group_text} {ARROW} **Rank:** (Guest Role) {ARROW} **Roles:** {get_role_names(rank_data['roles'])} {ARROW} **Nickname:** {rank_data['nickname']}"
                         else:
-                            text.append(f"**Roles:** (No Roles) {ARROW} **Nickname:** {bind_data['nickname']}")
+                            yield f"{group_text} {ARROW} **Rank:** {rank_id} {ARROW} **Roles:** {get_role_names(rank_data['roles'])} {ARROW} **Nickname:** {rank_data['nickname']}"
                     else:
-                        for bind_id, bind_vg_data in bind_data.items():
-                            display_name = bind_vg_data.get("displayName") or "(No Name)"
-                            role_names = set()
+                        yield f"{group_text} {ARROW} **Rank:** {rank_id} {ARROW} **Roles:** (Dynamic Roles) {ARROW} **Nickname:** {rank_data['nickname']}"
 
-                            if bind_vg_data["roles"]:
-                                for role_ in bind_vg_data["roles"]:
-                                    role_cache_find = role_cache.get(role_)
+                for range_data in group_data.get("ranges", []):
+                    if range_data["roles"]:
+                        yield f"{group_text} {ARROW} **Rank Range:** {range_data['low']} - {range_data['high']} {ARROW} **Roles:** {get_role_names(range_data['roles'])} {ARROW} **Nickname:** {range_data['nickname']}"
+                    else:
+                        yield f"{group_text} {ARROW} **Rank Range:** {range_data['low']} - {range_data['high']} {ARROW} **Roles:** (Dynamic Roles) {ARROW} **Nickname:** {range_data['nickname']}"
 
-                                    if role_cache_find:
-                                        role_names.add(role_cache_find)
-                                    else:
-                                        for role in guild.roles:
-                                            if role_ in (role.name, str(role.id)):
-                                                role_names.add(role.name)
-                                                role_cache[role_] = role.name
+        def category_binds(category, bind_data):
+            async def binds():
+                if category in ("devForum", "robloxStaff"):
+                    if bind_data["roles"]:
+                        yield f"**Roles:** {get_role_names(bind_data['roles'])} {ARROW} **Nickname:** {bind_data['nickname']}"
+                    else:
+                        yield f"**Roles:** (No Roles) {ARROW} **Nickname:** {bind_data['nickname']}"
 
-                                                break
-                                        else:
-                                            try:
-                                                int(role_)
-                                            except ValueError:
-                                                role_names.add(role_)
-                                                role_cache[role_] = role_
-                                            else:
-                                                # deleted role
-                                                # TODO: check if the role is saved in server settings, then delete it
-                                                role_names.add("(Deleted Role(s))")
-                                                role_cache[role_] = "(Deleted Role(s))"
+                    return
 
-                                text.append(f"**{category_non_plural_title}:** {display_name} ({bind_id}) {ARROW} **Roles:** {', '.join(role_names)} {ARROW} **Nickname:** {bind_vg_data['nickname']}")
+                category_non_plural_title = "GamePass" if category == "gamePasses" else category[:-1].title()
 
-                            else:
-                                text.append(f"**{category_non_plural_title}:** {display_name} ({bind_id}) {ARROW} **Roles:** (No Roles) {ARROW} **Nickname:** {bind_vg_data['nickname']}")
+                for bind_id, bind_vg_data in bind_data.items():
+                    display_name = bind_vg_data.get("displayName") or "(No Name)"
 
+                    if bind_vg_data["roles"]:
+                        yield f"**{category_non_plural_title}:** {display_name} ({bind_id}) {ARROW} **Roles:** {get_role_names(bind_vg_data['roles'])} {ARROW} **Nickname:** {bind_vg_data['nickname']}"
+                    else:
+                        yield f"**{category_non_plural_title}:** {display_name} ({bind_id}) {ARROW} **Roles:** (No Roles) {ARROW} **Nickname:** {bind_vg_data['nickname']}"
 
-                    if text:
-                        text = "\n".join(text)
-                        embed.add_field(name=category_title, value=text, inline=False)
+            return binds
 
+        bind_categories = {}
 
+        if group_ids:
+            bind_categories["Linked Groups"] = linked_groups
+
+        for category, bind_data in role_binds.items():
+            if not bind_data:
+                continue
+
+            if category == "groups":
+                bind_categories["Group Binds"] = group_binds
+            elif category == "gamePasses":
+                bind_categories["GamePasses"] = category_binds(category, bind_data)
+            elif category == "devForum":
+                bind_categories["DevForum Members"] = category_binds(category, bind_data)
+            elif category == "robloxStaff":
+                bind_categories["Roblox Staff"] = category_binds(category, bind_data)
+            else:
+                bind_categories[category.title()] = category_binds(category, bind_data)
 
+        embed = Embed(title="Bloxlink Role Binds")
         embed.set_author(name="Powered by Bloxlink", icon_url=Bloxlink.user.avatar.url)
-        embed.set_footer(text="Use /bind to make a new bind, or /unbind to delete a bind")
 
-        await CommandArgs.response.send(embed=embed)
+        paginator = InteractionPaginator(bind_categories, response, embed=embed, max_items=10, use_fields=False,
+                                         footer="Use /bind to make a new bind, or /unbind to delete a bind |")
+
+        await paginator()
@@ -71,6 +71,61 @@ VERIFY_URL = "https://blox.link/verify"
 
 VERIFYALL_MAX_SCAN = 5
 
+PENDING_VERIFICATIONS_LIMIT = 10000 # max in-flight guild_obligations per cluster
+FREE_ROLE_SCAN_MEMBERS = 10000 # largest unchunked server whose members a non-premium /update role may page through
+
+PREMIUM_CACHE_TTL = 300 # seconds to keep resolved premium profiles
+PREMIUM_CACHE_SIZE = 50000 # expired premium profiles are swept once the cache reaches this size
+
+PATRONS_SYNC_INTERVAL = 60 # seconds between patron delta syncs
+PATRONS_FULL_SYNC_EVERY = 60 # every nth patron sync reloads the whole collection
+PATRONS_BATCH_SIZE = 5000
+
+CARD_RENDER_CACHE_SIZE = 500 # rendered cards kept in memory per cluster
+CARD_RENDER_CACHE_TTL = 86400 # seconds rendered cards are kept in redis
+CARD_BACKGROUNDS_TTL = 3600 # seconds to keep the background catalog
+
+SHARED_USER_CACHE_TTL = 86400 # seconds Roblox users and Discord profiles are kept in the cross-cluster cache
+USER_SCOPE_TTLS = { # seconds each part of a cached Roblox user stays fresh
+    "groups": 300,
+    "presence": 60,
+    "badges": 3600,
+    "avatar": 3600,
+    "profile": 86400 # name, display name, description, join date
+}
+DEVFORUM_PROFILE_TTL = 21600 # seconds to keep a user's DevForum profile
+DEVFORUM_MISSING_TTL = 604800 # seconds to remember that a user has no DevForum account
+ROBLOX_DETAILS_TIMEOUT = 10 # seconds each part of a Roblox profile may take to load
+GROUP_RESOLVE_CONCURRENCY = 10 # group lookups /viewbinds runs at once
+WRITE_BEHIND_FIELDS = { # small flags which are written to the database in batches rather than immediately
+    "guilds": {"hasBot", "proBot", "logChannels", "oldPremiumWarningsSuppressed"}
+}
+WRITE_BEHIND_INTERVAL = 5 # seconds between flushes of batched writes
+WRITE_BEHIND_BATCH_SIZE = 500 # pending documents which trigger an early flush
+
+DB_PROFILER = env.get("DB_PROFILER", "false").lower() == "true" # record the shape and latency of every database query
+DB_PROFILER_SAMPLES = 1000 # latencies kept per query shape
+
+UPDATE_FINGERPRINT_TTL = 86400 # seconds an update's outcome is remembered for skipping identical updates
+
+AUTO_UPDATE_INTERVAL = 60 # seconds between background update rounds
+AUTO_UPDATE_BUDGET = 10 # members each guild may have updated per round, unless the guild sets autoUpdateBudget
+AUTO_UPDATE_MAX_BUDGET = 100 # highest autoUpdateBudget a guild may set
+AUTO_UPDATE_PAGE_SIZE = 1000 # members fetched from Discord each time a guild's queue is rebuilt
+AUTO_UPDATE_CONCURRENCY = 10 # guilds updated at once
+AUTO_UPDATE_SENSITIVITY_WEIGHT = 3600 # seconds of staleness each held bound role is worth
+LAST_UPDATED_TTL = 2592000 # seconds a guild's member update times are kept in redis after its last update
+
+PAGINATOR_PAGE_WINDOW = 2 # pages kept on either side of the current page by lazy paginators
+
+BLACKLIST_RELOAD_INTERVAL = 5 # seconds between checks for a changed blacklist file
+
+REQUEST_PRIORITY = { # lower runs first in the REST scheduler
+    "INTERACTIVE": 0, # commands and buttons
+    "EVENT": 1, # member joins, role changes
+    "BULK": 2, # mass /update, auto-updates
+}
+
 HTTP_RETRY_LIMIT = 5
 
 MODULE_DIR = [
@@ -80,6 +135,9 @@ MODULE_DIR = [
     "src/apps"
 ]
 
+STARTUP_REPORT_TIMEOUT = 30 # seconds to wait for module setups before printing the startup timings
+STARTUP_REPORT_SIZE = 25 # slowest modules to show in the startup timings
+
 NICKNAME_TEMPLATES = (
     "{roblox-name} \u2192 changes to their Roblox Username (unique)\n"
     "{display-name} \u2192 changes to their Roblox Display Name (not unique)\n"
@@ -138,6 +196,8 @@ OPTIONS = {                # fn,  type, max length or choices, premium only, des
     "joinChannel":           (lambda g, gd: bool(gd.get("joinChannel", True)), None, None, False, "Customize the join messages of people who join the server."),
     "leaveChannel":          (lambda g, gd: bool(gd.get("leaveChannel", True)), None, None, False, "Customize the leave messages of people who leave the server."),
     "persistRoles":          (None, "boolean", None, True,  "Update members' roles/nickname as they type."),
+    "autoUpdate":            (None, "boolean", None, True,  "Bloxlink will keep members' roles/nickname up-to-date in the background, starting with those updated longest ago."),
+    "autoUpdateBudget":      (None, "number", AUTO_UPDATE_MAX_BUDGET, True, "Set how many members Bloxlink may update in the background each minute when 'autoUpdate' is enabled."),
     "allowReVerify":         (None, "boolean", None, True,  "If this is enabled: members can change their Roblox account as many times as they want in your server; otherwise, only allow 1 account change."),
     "nicknameTemplate":      (None,  "string", 100,  False, "Set the universal nickname template. Note that `/bind` nicknames will override this."),
     "unverifiedRoleName":    (None,  "string", 100,  False, "Set the 'Unverified' role name -- the role that Unverified users get."),
@@ -167,6 +227,8 @@ DEFAULTS = {
     "autoVerification": True,
     "dynamicRoles": True,
     "persistRoles": False,
+    "autoUpdate": False,
+    "autoUpdateBudget": AUTO_UPDATE_BUDGET,
     "allowReVerify": True,
     "welcomeMessage": ":wave: Welcome to **{server-name}**, {roblox-name}! Visit <" + VERIFY_URL + "> to change your account.",
     "nicknameTemplate": "{smart-name}",
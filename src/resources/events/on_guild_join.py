@@ -35,7 +35,7 @@ class GuildJoinEvent(Bloxlink.Module):
         @Bloxlink.event
         async def on_guild_join(guild):
             try:
-                await check_restrictions("guilds", guild.id)
+                await check_restrictions(guilds=[guild.id])
             except Blacklisted:
                 await guild.leave()
                 return
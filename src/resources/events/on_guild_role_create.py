@@ -0,0 +1,15 @@
+from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+
+clear_magic_roles = Bloxlink.get_module("extras", attrs=["clear_magic_roles"])
+
+
+@Bloxlink.module
+class GuildRoleCreateEvent(Bloxlink.Module):
+    def __init__(self):
+        pass
+
+    async def __setup__(self):
+
+        @Bloxlink.event
+        async def on_guild_role_create(role):
+            clear_magic_roles(role.guild)
@@ -0,0 +1,17 @@
+from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+
+clear_magic_roles = Bloxlink.get_module("extras", attrs=["clear_magic_roles"])
+
+
+@Bloxlink.module
+class GuildRoleUpdateEvent(Bloxlink.Module):
+    def __init__(self):
+        pass
+
+    async def __setup__(self):
+
+        @Bloxlink.event
+        async def on_guild_role_update(before, after):
+            if before.name != after.name:
+                # magic roles can be matched by name
+                clear_magic_roles(after.guild)
@@ -1,4 +1,5 @@
 from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+from ..constants import REQUEST_PRIORITY # pylint: disable=import-error, no-name-in-module
 from ..exceptions import CancelCommand # pylint: disable=import-error, no-name-in-module
 
 get_guild_value = Bloxlink.get_module("cache", attrs=["get_guild_value"])
@@ -15,6 +16,6 @@ class MemberRemoveEvent(Bloxlink.Module):
         @Bloxlink.event
         async def on_member_remove(member):
             try:
-                await guild_obligations(member, member.guild, join=False, event=True)
+                await guild_obligations(member, member.guild, join=False, event=True, priority=REQUEST_PRIORITY["EVENT"])
             except CancelCommand:
                 pass
@@ -1,5 +1,5 @@
 from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
-from ..constants import DEFAULTS # pylint: disable=import-error, no-name-in-module
+from ..constants import DEFAULTS, REQUEST_PRIORITY # pylint: disable=import-error, no-name-in-module
 from ..exceptions import CancelCommand, RobloxDown, Blacklisted # pylint: disable=import-error, no-name-in-module
 import discord
 
@@ -33,7 +33,7 @@ class MemberUpdateEvent(Bloxlink.Module):
 
                 if auto_verification or auto_roles:
                     try:
-                        await guild_obligations(after, guild, cache=False, join=True, dm=True, event=True, exceptions=("RobloxDown", "Blacklisted"))
+                        await guild_obligations(after, guild, cache=False, join=True, dm=True, event=True, exceptions=("RobloxDown", "Blacklisted"), priority=REQUEST_PRIORITY["EVENT"])
                     except CancelCommand:
                         pass
                     except RobloxDown:
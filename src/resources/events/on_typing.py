@@ -1,7 +1,7 @@
 from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
 from discord import Member, Object
 from discord.utils import find
-from ..constants import DEFAULTS, RELEASE # pylint: disable=import-error, no-name-in-module
+from ..constants import DEFAULTS, RELEASE, REQUEST_PRIORITY # pylint: disable=import-error, no-name-in-module
 from ..exceptions import CancelCommand # pylint: disable=import-error, no-name-in-module
 
 cache_get, cache_set, get_guild_value = Bloxlink.get_module("cache", attrs=["get", "set", "get_guild_value"])
@@ -38,6 +38,6 @@ class ChannelTypingEvent(Bloxlink.Module):
 
                         if not await has_magic_role(user, guild, "Bloxlink Bypass"):
                             try:
-                                await guild_obligations(user, guild, join=True, dm=False, event=False)
+                                await guild_obligations(user, guild, join=True, dm=False, event=False, priority=REQUEST_PRIORITY["EVENT"])
                             except CancelCommand:
                                 pass
@@ -0,0 +1,142 @@
+from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+from ..exceptions import BloxlinkException, PermissionError # pylint: disable=import-error, no-name-in-module, redefined-builtin
+from ..constants import (DEFAULTS, REQUEST_PRIORITY, AUTO_UPDATE_INTERVAL, AUTO_UPDATE_MAX_BUDGET, # pylint: disable=import-error, no-name-in-module
+                         AUTO_UPDATE_CONCURRENCY, AUTO_UPDATE_SENSITIVITY_WEIGHT, AUTO_UPDATE_PAGE_SIZE)
+import asyncio
+import heapq
+import discord
+
+get_guild_value = Bloxlink.get_module("cache", attrs=["get_guild_value"])
+guild_obligations, get_binds, get_last_updated = Bloxlink.get_module("roblox", attrs=["guild_obligations", "get_binds", "get_last_updated"])
+has_premium = Bloxlink.get_module("premium", attrs=["has_premium"])
+
+
+@Bloxlink.module
+class AutoUpdate(Bloxlink.Module):
+    """refreshes members of guilds with autoUpdate enabled in the background, a few at a time,
+    starting with the members who were updated longest ago"""
+
+    def __init__(self):
+        self.queues = {} # guild id: heap of (priority, last updated, member id)
+        self.members = {} # guild id: {member id: member} left to update from the current page
+        self.cursors = {} # guild id: last member id of the last fully processed page
+        self.page_ends = {} # guild id: last member id of the current page, or None if it's the last page
+
+    async def __setup__(self):
+        await self.client.wait_until_ready()
+
+        while True:
+            await asyncio.sleep(AUTO_UPDATE_INTERVAL)
+
+            try:
+                await self.update_guilds()
+            except Exception as e: # pylint: disable=broad-except
+                Bloxlink.log(f"ERROR | Auto-update failed: {e}")
+
+    async def update_guilds(self):
+        semaphore = asyncio.Semaphore(AUTO_UPDATE_CONCURRENCY)
+        enabled_guilds = set()
+
+        async def update_guild(guild):
+            async with semaphore:
+                if not await get_guild_value(guild, ["autoUpdate", DEFAULTS.get("autoUpdate")]):
+                    return
+
+                if "premium" not in (await has_premium(guild=guild)).features:
+                    return
+
+                enabled_guilds.add(guild.id)
+
+                await self.update_stalest_members(guild)
+
+        await asyncio.gather(*[update_guild(guild) for guild in self.client.guilds])
+
+        for guild_id in [guild_id for guild_id in self.queues if guild_id not in enabled_guilds]:
+            self.queues.pop(guild_id)
+            self.members.pop(guild_id, None)
+            self.cursors.pop(guild_id, None)
+            self.page_ends.pop(guild_id, None)
+
+    async def build_queue(self, guild):
+        """orders a page of the guild's members by when they were last updated. members holding
+        bound roles are moved up since rank changes affect them the most.
+
+        guilds aren't chunked, so members are fetched from Discord AUTO_UPDATE_PAGE_SIZE at a time.
+        members are only ordered against their own page, and the pages are worked through in turn."""
+
+        role_binds, _ = await get_binds(guild)
+        bound_roles = set()
+
+        for group_binds in role_binds.get("groups", {}).values():
+            for bind_data in (*group_binds.get("binds", {}).values(), *group_binds.get("ranges", [])):
+                bound_roles.update(bind_data.get("roles") or ())
+
+        bound_role_ids = {role.id for role in guild.roles if str(role.id) in bound_roles or role.name in bound_roles}
+        cursor = self.cursors.get(guild.id)
+        members = {}
+        queue = []
+
+        async for member in guild.fetch_members(limit=AUTO_UPDATE_PAGE_SIZE, after=cursor and discord.Object(cursor)):
+            members[member.id] = member
+
+        # the cursor only moves on once this page has been worked through, see update_stalest_members
+        self.page_ends[guild.id] = max(members) if len(members) == AUTO_UPDATE_PAGE_SIZE else None
+        last_updated = await get_last_updated(guild.id, [member_id for member_id, member in members.items() if not member.bot])
+
+        for member in members.values():
+            if member.bot:
+                continue
+
+            sensitivity = len(bound_role_ids.intersection(member._roles))
+            member_updated = last_updated.get(member.id, 0)
+
+            queue.append((member_updated - sensitivity * AUTO_UPDATE_SENSITIVITY_WEIGHT, member_updated, member.id))
+
+        heapq.heapify(queue)
+        self.members[guild.id] = members
+
+        return queue
+
+    async def update_stalest_members(self, guild):
+        queue = self.queues.get(guild.id)
+
+        if not queue:
+            queue = self.queues[guild.id] = await self.build_queue(guild)
+
+        budget = await get_guild_value(guild, ["autoUpdateBudget", DEFAULTS.get("autoUpdateBudget")])
+        budget = max(0, min(int(budget), AUTO_UPDATE_MAX_BUDGET))
+        members = self.members.get(guild.id, {})
+
+        while queue and budget:
+            _, member_updated, member_id = heapq.heappop(queue)
+            fetched_member = members.pop(member_id, None)
+            member = guild.get_member(member_id) or fetched_member
+
+            if not member:
+                continue
+
+            if (await get_last_updated(guild.id, [member_id])).get(member_id, 0) > member_updated:
+                # updated some other way since the queue was built
+                continue
+
+            budget -= 1
+
+            try:
+                await guild_obligations(member, guild, join=None, cache=False, dm=False, event=False, priority=REQUEST_PRIORITY["BULK"])
+            except PermissionError:
+                # the bot can't manage roles here; rebuild the same page on the next pass
+                self.queues.pop(guild.id, None)
+                self.members.pop(guild.id, None)
+                return
+            except (BloxlinkException, discord.errors.HTTPException):
+                pass
+
+        if not queue:
+            # the page is done, so the next rebuild moves on to the next one
+            page_end = self.page_ends.pop(guild.id, None)
+
+            if page_end:
+                self.cursors[guild.id] = page_end
+            else:
+                # reached the end of the member list; start over
+                self.cursors.pop(guild.id, None)
@@ -1,56 +1,159 @@
 from ..structures import Bloxlink # pylint: disable=import-error, no-name-in-module
 from ..exceptions import Blacklisted # pylint: disable=import-error, no-name-in-module
+from ..constants import BLACKLIST_RELOAD_INTERVAL # pylint: disable=import-error, no-name-in-module
+import asyncio
 import json
 import logging
+import os
+import sys
 
 cache_get, get_guild_value = Bloxlink.get_module("cache", attrs=["get", "get_guild_value"])
 
+BLACKLIST_PATH = "src/data/blacklist.json"
+
+RESTRICTION_TYPES = ("users", "roles", "robloxAccounts", "groups")
+EMPTY_RESTRICTIONS = {"reasons": {}, **{typex: frozenset() for typex in RESTRICTION_TYPES}}
+
 
 @Bloxlink.module
 class Blacklist(Bloxlink.Module):
     def __init__(self):
-        self.blacklist = {
+        self.blacklist = self.build_blacklist({})
+        self.blacklist_mtime = None
+        self.guild_restrictions = {} # guild id -> compiled restrictions
+
+    async def __setup__(self):
+        # picks up edits to the blacklist file without a restart
+        while True:
+            try:
+                mtime = os.stat(BLACKLIST_PATH).st_mtime
+            except FileNotFoundError:
+                if self.blacklist_mtime is None:
+                    logging.error("Blacklist file not found.")
+                    self.blacklist_mtime = 0
+            except Exception as e: # pylint: disable=broad-except
+                Bloxlink.log(f"ERROR | Failed to check the blacklist file: {e}")
+            else:
+                if mtime != self.blacklist_mtime:
+                    self.blacklist_mtime = mtime
+
+                    try:
+                        await self.reload_blacklist()
+                    except Exception as e: # pylint: disable=broad-except
+                        Bloxlink.log(f"ERROR | Failed to reload the blacklist: {e}")
+
+            await asyncio.sleep(BLACKLIST_RELOAD_INTERVAL)
+
+    @staticmethod
+    def build_blacklist(blacklist_json):
+        """builds the blacklist as {type: {int id: reason}}. reasons are interned since many entries share them."""
+
+        blacklist = {
             "users": {},
             "guilds": {},
             "robloxAccounts": {},
             "roles": {}
         }
 
-    async def __setup__(self):
+        for user_id, user_data in blacklist_json.get("users", {}).items():
+            reason = user_data.get("reason")
+            reason = sys.intern(reason) if reason else True
+
+            blacklist["users"][int(user_id)] = reason
+
+            for roblox_id in user_data.get("robloxAccounts", []):
+                blacklist["robloxAccounts"][int(roblox_id)] = reason
+
+            for guild_id in user_data.get("guilds", []):
+                blacklist["guilds"][int(guild_id)] = reason
+
+        for guild_id, reason in blacklist_json.get("guilds", {}).items():
+            blacklist["guilds"][int(guild_id)] = sys.intern(reason) if isinstance(reason, str) else reason
+
+        return blacklist
+
+    async def reload_blacklist(self, blacklist_json=None):
+        """reloads the blacklist from the file, or from blacklist_json if given. the new
+        blacklist is built on the side and swapped in at once, so checks never see a partial list.
+        the previous blacklist is kept if the new one can't be loaded."""
+
         try:
-            with open("src/data/blacklist.json", "r+") as f:
-                blacklist_json = json.load(f)
+            if blacklist_json is None:
+                blacklist_json = await self.loop.run_in_executor(None, self.read_blacklist_file)
+
+            blacklist = self.build_blacklist(blacklist_json)
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            logging.error(f"Unable to load the blacklist: {e}")
+            return
+
+        self.blacklist = blacklist
+
+        Bloxlink.log(f"Loaded the blacklist ({sum(len(entries) for entries in self.blacklist.values())} entries)")
 
-                for user_id, user_data in blacklist_json["users"].items():
-                    reason = user_data.get("reason") or True
+    @staticmethod
+    def read_blacklist_file():
+        with open(BLACKLIST_PATH, "r") as f:
+            return json.load(f)
 
-                    self.blacklist["users"][user_id] = reason
+    @staticmethod
+    def compile_restrictions(restrictions):
+        """turns the guild's restrictions into frozensets of int IDs per type, with the reasons alongside.
+        malformed IDs are skipped so they can't break the rest of the guild's restrictions."""
 
-                    for roblox_id in user_data.get("robloxAccounts", []):
-                        self.blacklist["robloxAccounts"][roblox_id] = reason
+        if not restrictions:
+            return EMPTY_RESTRICTIONS
 
-                    for guild_id in user_data.get("guilds", []):
-                        self.blacklist["guilds"][guild_id] = reason
+        index = {}
+        reasons = {}
 
-                for guild_id, reason in blacklist_json["guilds"].items():
-                    self.blacklist["guilds"][guild_id] = reason
+        for typex in RESTRICTION_TYPES:
+            restricted_ids = []
 
-        except FileNotFoundError:
-            logging.error("Blacklist file not found.")
+            for idx, restriction in (restrictions.get(typex) or {}).items():
+                try:
+                    idx = int(idx)
+                except (TypeError, ValueError):
+                    continue
 
-    async def check_restrictions(self, typex, *ids, guild=None, roblox_user=None):
+                restricted_ids.append(idx)
+                reasons[(typex, idx)] = restriction.get("reason") if isinstance(restriction, dict) else None
+
+            index[typex] = frozenset(restricted_ids)
+
+        index["reasons"] = reasons
+
+        return index
+
+    async def get_restrictions(self, guild):
+        index = self.guild_restrictions.get(guild.id)
+
+        if index is None:
+            index = self.guild_restrictions[guild.id] = self.compile_restrictions(await get_guild_value(guild, "restrictions"))
+
+        return index
+
+    def clear_restrictions(self, guild=None):
+        """drops the compiled restrictions so they're rebuilt on the next check. should be called after writing restrictions."""
+
+        if guild:
+            self.guild_restrictions.pop(guild.id, None)
+        else:
+            self.guild_restrictions.clear()
+
+    async def check_restrictions(self, *, guild=None, roblox_user=None, **ids_by_type):
+        """raises Blacklisted if any of the IDs, given per type (e.g. users=[...], roles=[...]), are restricted by
+        the guild or by Bloxlink. the guild's restrictions are looked up once for all of them."""
 
         # server restrictions
         if guild:
-            restrictions = await get_guild_value(guild, "restrictions")
+            restrictions = await self.get_restrictions(guild)
 
-            if restrictions:
-                for idx in ids:
-                    idx = str(idx)
-                    restriction = restrictions.get(typex, {}).get(idx, {})
+            if restrictions is not EMPTY_RESTRICTIONS:
+                for typex, ids in ids_by_type.items():
+                    matched = restrictions.get(typex, frozenset()).intersection(int(idx) for idx in ids)
 
-                    if restriction:
-                        reason = restriction.get("reason")
+                    if matched:
+                        reason = restrictions["reasons"].get((typex, next(iter(matched))))
 
                         if reason:
                             if reason.endswith("."):
@@ -60,34 +163,37 @@ class Blacklist(Bloxlink.Module):
 
                         raise Blacklisted("This server has prevented you from using Bloxlink. This is NOT a Bloxlink blacklist.", guild_restriction=True)
 
-                    if roblox_user:
-                        for restricted_group_id, restricted_group in restrictions.get("groups", {}).items():
-                            group = roblox_user.groups.get(restricted_group_id)
+                if roblox_user and restrictions["groups"]:
+                    matched_groups = restrictions["groups"].intersection(int(group_id) for group_id in roblox_user.groups)
 
-                            if group:
-                                reason = restricted_group.get("reason")
+                    if matched_groups:
+                        restricted_group_id = next(iter(matched_groups))
+                        group = roblox_user.groups[str(restricted_group_id)]
+                        reason = restrictions["reasons"].get(("groups", restricted_group_id))
 
-                                if reason:
-                                    if reason.endswith("."):
-                                        reason = reason[:-1]
+                        if reason:
+                            if reason.endswith("."):
+                                reason = reason[:-1]
 
-                                    raise Blacklisted(f"This server has prevented your group `{group.name}` from verifying for: `{reason}`. This is NOT a Bloxlink blacklist.", guild_restriction=True)
+                            raise Blacklisted(f"This server has prevented your group `{group.name}` from verifying for: `{reason}`. This is NOT a Bloxlink blacklist.", guild_restriction=True)
 
-                                raise Blacklisted(f"This server has prevented your group `{group.name}` from verifying. This is NOT a Bloxlink blacklist.", guild_restriction=True)
+                        raise Blacklisted(f"This server has prevented your group `{group.name}` from verifying. This is NOT a Bloxlink blacklist.", guild_restriction=True)
 
         # bloxlink-wide restrictions
-        for idx in ids:
-            idx = str(idx)
-            global_restriction = self.blacklist[typex].get(idx)
+        for typex, ids in ids_by_type.items():
+            blacklist = self.blacklist[typex]
+
+            for idx in ids:
+                global_restriction = blacklist.get(int(idx))
 
-            if global_restriction:
-                if isinstance(global_restriction, str):
-                    if typex == "guilds":
-                        raise Blacklisted(f"This server is restricted from using Bloxlink due to a policy violation: `{global_restriction}`")
+                if global_restriction:
+                    if isinstance(global_restriction, str):
+                        if typex == "guilds":
+                            raise Blacklisted(f"This server is restricted from using Bloxlink due to a policy violation: `{global_restriction}`")
 
-                    raise Blacklisted(f"You are restricted from using Bloxlink due to a policy violation: `{global_restriction}`.")
-                else:
-                    if typex == "guilds":
-                        raise Blacklisted("This server is restricted from using Bloxlink due to a policy violation.")
+                        raise Blacklisted(f"You are restricted from using Bloxlink due to a policy violation: `{global_restriction}`.")
+                    else:
+                        if typex == "guilds":
+                            raise Blacklisted("This server is restricted from using Bloxlink due to a policy violation.")
 
-                    raise Blacklisted("You are restricted from using Bloxlink due to a policy violation.")
+                        raise Blacklisted("You are restricted from using Bloxlink due to a policy violation.")
@@ -1,12 +1,33 @@
 from ..structures import Bloxlink # pylint: disable=import-error, no-name-in-module, no-name-in-module
-from ..constants import CACHE_CLEAR # pylint: disable=import-error, no-name-in-module, no-name-in-module
+from ..constants import CACHE_CLEAR, WRITE_BEHIND_FIELDS, WRITE_BEHIND_INTERVAL, WRITE_BEHIND_BATCH_SIZE # pylint: disable=import-error, no-name-in-module, no-name-in-module
 from benedict import benedict
+from pymongo import UpdateOne
+import asyncio
 
 
 @Bloxlink.module
 class Cache(Bloxlink.Module):
     def __init__(self):
         self._cache = benedict(keypath_separator=":")
+        self.pending_writes = {} # (typex, _id): {"$set": {}, "$unset": {}}
+        self.inflight_writes = {} # pending writes taken by the running flush, same shape
+        self.flush_lock = asyncio.Lock()
+        self.flush_task = None # flush started because the queue filled up
+        self.value_listeners = {} # (typex, setting name): [callbacks called with the document ID when it's written]
+
+    async def __setup__(self):
+        while True:
+            await asyncio.sleep(WRITE_BEHIND_INTERVAL)
+
+            await self.try_flush_writes()
+
+    async def try_flush_writes(self):
+        """flushes the pending writes, logging failures. failed writes stay queued for the next flush."""
+
+        try:
+            await self.flush_writes()
+        except Exception as e: # pylint: disable=broad-except
+            Bloxlink.log(f"ERROR | Failed to flush pending writes: {e}")
 
     async def get(self, k, primitives=False, redis_hash=False, redis_hash_exists=False):
         if primitives and self.cache and k:
@@ -62,7 +83,7 @@ class Cache(Bloxlink.Module):
         if not items:
             mongo_data = await self.db[typex].find_one({"_id": str(idx)}) or {}
 
-            return mongo_data
+            return self.apply_pending_writes(typex, idx, mongo_data)
 
 
         for item_name in items:
@@ -85,6 +106,7 @@ class Cache(Bloxlink.Module):
         if left_overs:
             left_overs["_id"] = 0
             mongo_data = await self.db[typex].find_one({"_id": str(idx)}, left_overs) or {}
+            mongo_data = self.apply_pending_writes(typex, idx, mongo_data, left_overs)
 
             for k, v in mongo_data.items():
                 await self.set(f"{typex}_data:{idx}:{k}", v, check_primitives=False)
@@ -113,6 +135,11 @@ class Cache(Bloxlink.Module):
 
             await self.set(f"{typex}_data:{idx}:{k}", v, check_primitives=False)
 
+        for (listener_typex, k), callbacks in self.value_listeners.items():
+            if listener_typex == typex and (parent_value or k in items):
+                for callback in callbacks:
+                    callback(idx)
+
         if not skip_db:
             mongo_data = {
                 "$currentDate": {
@@ -120,6 +147,28 @@ class Cache(Bloxlink.Module):
                 }
             }
 
+            if not parent_value and items and set(items).issubset(WRITE_BEHIND_FIELDS.get(typex, ())):
+                self.queue_write(typex, idx, insertion, unset)
+
+                if len(self.pending_writes) >= WRITE_BEHIND_BATCH_SIZE and not (self.flush_task and not self.flush_task.done()):
+                    # flushed in the background: this caller's write is only queued, so a failed flush isn't its error
+                    self.flush_task = self.loop.create_task(self.try_flush_writes())
+
+                return
+
+            if (typex, str(idx)) in self.inflight_writes:
+                # let the running flush land first so it can't overwrite this write
+                async with self.flush_lock:
+                    pass
+
+            pending_write = self.pending_writes.get((typex, str(idx)))
+
+            if pending_write:
+                # this write supersedes any batched changes to the same fields
+                for k in items:
+                    pending_write["$set"].pop(k, None)
+                    pending_write["$unset"].pop(k, None)
+
             if insertion:
                 mongo_data["$set"] = insertion
             if unset:
@@ -127,6 +176,93 @@ class Cache(Bloxlink.Module):
 
             await self.db[typex].update_one({"_id": str(idx)}, mongo_data, upsert=True)
 
+    def on_value_set(self, typex, name, callback):
+        """calls callback with the document ID whenever the setting is written, so anything built from it can be dropped"""
+
+        self.value_listeners.setdefault((typex, name), []).append(callback)
+
+    def queue_write(self, typex, idx, insertion, unset):
+        """merges the change into the pending update for the document"""
+
+        pending_write = self.pending_writes.setdefault((typex, str(idx)), {"$set": {}, "$unset": {}})
+
+        for k, v in insertion.items():
+            pending_write["$unset"].pop(k, None)
+            pending_write["$set"][k] = v
+
+        for k in unset:
+            pending_write["$set"].pop(k, None)
+            pending_write["$unset"][k] = ""
+
+    def apply_pending_writes(self, typex, idx, mongo_data, projection=None):
+        """applies unflushed writes on top of a document read from the database, including
+        the ones a flush is still writing"""
+
+        for pending_write in (self.inflight_writes.get((typex, str(idx))), self.pending_writes.get((typex, str(idx)))):
+            if pending_write:
+                for k, v in pending_write["$set"].items():
+                    if projection is None or k in projection:
+                        mongo_data[k] = v
+
+                for k in pending_write["$unset"]:
+                    mongo_data.pop(k, None)
+
+        return mongo_data
+
+    def requeue_writes(self, failed_writes):
+        """puts writes that failed to flush back in the queue. fields changed again since
+        the flush started keep their newer value."""
+
+        for key, failed_write in failed_writes.items():
+            pending_write = self.pending_writes.setdefault(key, {"$set": {}, "$unset": {}})
+            changed = {*pending_write["$set"], *pending_write["$unset"]}
+
+            for k, v in failed_write["$set"].items():
+                if k not in changed:
+                    pending_write["$set"][k] = v
+
+            for k in failed_write["$unset"]:
+                if k not in changed:
+                    pending_write["$unset"][k] = ""
+
+    async def flush_writes(self):
+        """writes the pending updates to the database, one bulk_write per collection. writes
+        that fail are queued again for the next flush."""
+
+        async with self.flush_lock:
+            self.inflight_writes, self.pending_writes = self.pending_writes, {}
+            batches = {}
+
+            for key in self.inflight_writes:
+                batches.setdefault(key[0], []).append(key)
+
+            try:
+                for typex, keys in batches.items():
+                    for i in range(0, len(keys), WRITE_BEHIND_BATCH_SIZE):
+                        batch = keys[i:i+WRITE_BEHIND_BATCH_SIZE]
+                        operations = []
+
+                        for key in batch:
+                            pending_write = self.inflight_writes[key]
+                            mongo_data = {"$currentDate": {"updatedAt": True}}
+
+                            if pending_write["$set"]:
+                                mongo_data["$set"] = dict(pending_write["$set"])
+                            if pending_write["$unset"]:
+                                mongo_data["$unset"] = dict(pending_write["$unset"])
+
+                            operations.append(UpdateOne({"_id": key[1]}, mongo_data, upsert=True))
+
+                        await self.db[typex].bulk_write(operations, ordered=False)
+
+                        for key in batch:
+                            self.inflight_writes.pop(key)
+
+            finally:
+                # anything still in flight wasn't written
+                failed_writes, self.inflight_writes = self.inflight_writes, {}
+                self.requeue_writes(failed_writes)
+
     # convenience wrappers
     async def get_guild_value(self, guild, *items):
         return await self.get_db_value("guilds", guild, *items)
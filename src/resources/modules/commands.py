@@ -14,11 +14,13 @@ from resources.modules.premium import OldPremiumView # pylint: disable=import-er
 import datetime
 import random
 import time
+import hashlib
+import json
 
 
 fetch = Bloxlink.get_module("utils", attrs=["fetch"])
 get_enabled_addons = Bloxlink.get_module("addonsm", attrs="get_enabled_addons")
-get_guild_value, set_db_value, set_guild_value = Bloxlink.get_module("cache", attrs=["get_guild_value", "set_db_value", "set_guild_value"])
+get_guild_value, set_db_value, set_guild_value, on_value_set = Bloxlink.get_module("cache", attrs=["get_guild_value", "set_db_value", "set_guild_value", "on_value_set"])
 check_restrictions = Bloxlink.get_module("blacklist", attrs=["check_restrictions"])
 has_magic_role = Bloxlink.get_module("extras", attrs=["has_magic_role"])
 has_premium = Bloxlink.get_module("premium", attrs=["has_premium"])
@@ -27,14 +29,22 @@ has_premium = Bloxlink.get_module("premium", attrs=["has_premium"])
 BOT_ID = BOTS[RELEASE]
 COMMANDS_URL = f"https://discord.com/api/v8/applications/{BOT_ID}/commands"
 GUILD_COMMANDS_URL = "https://discord.com/api/v8/applications/{BOT_ID}/guilds/{GUILD_ID}/commands"
+COMMAND_HASHES_KEY = f"slash_command_hashes:{RELEASE}"
 
 
 
 @Bloxlink.module
 class Commands(Bloxlink.Module):
     """mannages interaction commands"""
+
+    dependencies = ("addonsm",) # addon commands must be registered before we sync
+
     def __init__(self):
         self.commands   = {}
+        self.command_names = {} # command names and aliases -> command
+        self.prefixes = {} # guild id -> prefix
+
+        on_value_set("guilds", "prefix", lambda guild_id: self.prefixes.pop(int(guild_id), None))
 
     async def __loaded__(self):
         """sync the slash commands and context-menus"""
@@ -62,21 +72,40 @@ class Commands(Bloxlink.Module):
                         all_guild_commands[guild_id] = all_guild_commands.get(guild_id) or []
                         all_guild_commands[guild_id].append(command_json)
 
-            text, response = await fetch(COMMANDS_URL, "PUT", body=interaction_commands, headers={"Authorization": f"Bot {TOKEN}"}, raise_on_failure=False)
+            # only PUT the command sets that changed since the last sync
+            old_hashes = {}
 
-            if response.status == 200:
-                Bloxlink.log("Successfully synced the Global Slash Commands")
-            elif response.status != 403:
-                print(interaction_commands, flush=True)
-                print(response.status, text, flush=True)
+            if self.redis:
+                old_hashes = {k.decode("utf-8"): v.decode("utf-8") for k, v in (await self.redis.hgetall(COMMAND_HASHES_KEY)).items()}
+
+            command_sets = {"global": (COMMANDS_URL, interaction_commands)}
 
             for guild_command_id, guild_commands in all_guild_commands.items():
-                text, response = await fetch(GUILD_COMMANDS_URL.format(BOT_ID=BOT_ID, GUILD_ID=guild_command_id), "PUT", body=guild_commands, headers={"Authorization": f"Bot {TOKEN}"}, raise_on_failure=False)
+                command_sets[str(guild_command_id)] = (GUILD_COMMANDS_URL.format(BOT_ID=BOT_ID, GUILD_ID=guild_command_id), guild_commands)
+
+            for removed_guild_id in old_hashes.keys() - command_sets.keys():
+                # this guild no longer has any guild-specific commands
+                command_sets[removed_guild_id] = (GUILD_COMMANDS_URL.format(BOT_ID=BOT_ID, GUILD_ID=removed_guild_id), [])
+
+            for set_name, (url, commands) in command_sets.items():
+                commands_hash = self.hash_commands(commands)
+
+                if old_hashes.get(set_name) == commands_hash:
+                    continue
+
+                text, response = await fetch(url, "PUT", body=commands, headers={"Authorization": f"Bot {TOKEN}"}, raise_on_failure=False)
 
                 if response.status == 200:
-                    Bloxlink.log(f"Successfully synced Slash Commands for guild {guild_command_id}")
+                    Bloxlink.log(f"Successfully synced the Slash Commands for {set_name}")
+
+                    if self.redis:
+                        if commands or set_name == "global":
+                            await self.redis.hset(COMMAND_HASHES_KEY, set_name, commands_hash)
+                        else:
+                            await self.redis.hdel(COMMAND_HASHES_KEY, set_name)
+
                 elif response.status != 403:
-                    print(interaction_commands, flush=True)
+                    print(commands, flush=True)
                     print(response.status, text, flush=True)
 
             # # list commands
@@ -85,17 +114,33 @@ class Commands(Bloxlink.Module):
             # print(text)
 
 
+    @staticmethod
+    def hash_commands(commands):
+        """returns a stable hash of the command payloads so unchanged sets can be skipped.
+        commands are sorted first since their load order isn't guaranteed."""
+
+        payloads = sorted(json.dumps(command, sort_keys=True, separators=(",", ":")) for command in commands)
+
+        return hashlib.sha256("\n".join(payloads).encode("utf-8")).hexdigest()
+
     async def parse_message(self, message):
         guild = message.guild
-        prefix = await get_guild_value(guild, ["prefix", "!"])
+        guild_id = guild and guild.id
+        prefix = self.prefixes.get(guild_id)
+
+        if prefix is None:
+            prefix = self.prefixes[guild_id] = await get_guild_value(guild, ["prefix", "!"])
 
         if message.content.startswith(prefix):
-            command_name = message.content[len(prefix):].split(" ")[0]
+            command_name = message.content[len(prefix):].split(" ", 1)[0]
+
+            if command_name in self.command_names:
+                await self.post_slash_command_warning(command_name, message)
 
-            for index, command in self.commands.items():
-                if index == command_name or command_name in getattr(command, "aliases", []):
-                    await self.post_slash_command_warning(command_name, message)
-                    break
+    def clear_prefixes(self):
+        """forgets the cached guild prefixes so changed prefixes are picked up again"""
+
+        self.prefixes.clear()
 
     async def post_slash_command_warning(self, command_name, message):
         channel = message.channel
@@ -503,6 +548,11 @@ class Commands(Bloxlink.Module):
         self.commands[command.name] = command
         command.addon = addon
 
+        self.command_names[command.name] = command
+
+        for alias in command.aliases:
+            self.command_names[alias] = command
+
         self.loop.create_task(self.inject_command(command))
 
         return command_structure
@@ -545,6 +595,7 @@ class Commands(Bloxlink.Module):
             self.loop.create_task(a.__setup__())
 
         self.commands[app.name] = app
+        self.command_names[app.name] = app
 
         return application_structure
 
@@ -614,10 +665,11 @@ class Commands(Bloxlink.Module):
 
         try:
             if guild:
-                await check_restrictions("guilds", guild.id) or await check_restrictions("users", guild.owner_id)
-                await check_restrictions("roles", *[r.id for r in user.roles], guild=guild)
-
-            await check_restrictions("users", user.id, guild=guild)
+                # the owner is only checked against the Bloxlink blacklist, not the server's own restrictions
+                await check_restrictions(guilds=[guild.id], users=[guild.owner_id])
+                await check_restrictions(guild=guild, roles=[r.id for r in user.roles], users=[user.id])
+            else:
+                await check_restrictions(users=[user.id])
 
         except Blacklisted as b:
             await interaction.response.send_message(b.message, ephemeral=True)
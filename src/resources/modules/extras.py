@@ -2,31 +2,65 @@ from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-na
 from ..constants import MAGIC_ROLES # pylint: disable=import-error, no-name-in-module
 
 
-get_guild_value = Bloxlink.get_module("cache", attrs=["get_guild_value"])
+get_guild_value, on_value_set = Bloxlink.get_module("cache", attrs=["get_guild_value", "on_value_set"])
+
+MAGIC_ROLE_FLAGS = {magic_role_name: 1 << i for i, magic_role_name in enumerate(MAGIC_ROLES)}
+ANY_MAGIC_ROLE = sum(MAGIC_ROLE_FLAGS.values())
 
 
 @Bloxlink.module
 class Extras(Bloxlink.Module):
     def __init__(self):
-        pass
+        self.magic_role_indexes = {} # guild id -> {role id: flags}
+
+        on_value_set("guilds", "magicRoles", lambda guild_id: self.magic_role_indexes.pop(int(guild_id), None))
+
+    @staticmethod
+    def build_magic_role_index(guild, magic_roles):
+        """maps role IDs to a bitmask of their magic roles, from both the role names and the magicRoles setting"""
+
+        index = {}
+
+        for role in guild.roles:
+            flag = MAGIC_ROLE_FLAGS.get(role.name)
+
+            if flag:
+                index[role.id] = flag
+
+        for role_id, magic_role_names in magic_roles.items():
+            if role_id == "undefined":
+                continue
+
+            for magic_role_name in magic_role_names:
+                flag = MAGIC_ROLE_FLAGS.get(magic_role_name)
+
+                if flag:
+                    index[int(role_id)] = index.get(int(role_id), 0) | flag
+
+        return index
+
+    def clear_magic_roles(self, guild=None):
+        """drops the magic role indexes so they're rebuilt on the next check, e.g. after roles were renamed"""
+
+        if guild:
+            self.magic_role_indexes.pop(guild.id, None)
+        else:
+            self.magic_role_indexes.clear()
 
     async def has_magic_role(self, author, guild, magic_role_name=None, magic_roles_data=None):
-        has_any_magic_role = False
-        magic_roles = magic_roles_data or await get_guild_value(guild, "magicRoles") or {}
+        index = self.magic_role_indexes.get(guild.id)
+
+        # writing magicRoles and role renames/creations drop the index
+        if index is None:
+            magic_roles = magic_roles_data or await get_guild_value(guild, "magicRoles") or {}
+            index = self.magic_role_indexes[guild.id] = self.build_magic_role_index(guild, magic_roles)
 
-        for role in author.roles:
-            if role.name == magic_role_name:
-                has_any_magic_role = True
-                return True
-            else:
-                if role.name in MAGIC_ROLES:
-                    has_any_magic_role = True
+        flags = 0
 
-        users_magic_roles = filter(lambda rd: author.get_role(int(rd[0]) if rd[0] != "undefined" else 0), magic_roles.items())
+        for role_id in author._roles: # pylint: disable=protected-access
+            flags |= index.get(role_id, 0)
 
         if not magic_role_name:
-            return bool(users_magic_roles) or has_any_magic_role
+            return bool(flags)
 
-        for magic_role in users_magic_roles:
-            if magic_role_name in magic_role[1]:
-                return True
+        return bool(flags & MAGIC_ROLE_FLAGS.get(magic_role_name, 0))
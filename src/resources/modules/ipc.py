@@ -4,6 +4,7 @@ import uuid
 import asyncio
 import discord
 from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+from ..structures.Card import Card # pylint: disable=import-error, no-name-in-module
 from ..constants import CLUSTER_ID, SHARD_RANGE, STARTED, RELEASE, GREEN_COLOR, PROMPT, PLAYING_STATUS # pylint: disable=import-error, no-name-in-module
 from ..exceptions import (BloxlinkBypass, Blacklisted, Blacklisted, PermissionError, # pylint: disable=import-error, no-name-in-module
                          RobloxAPIError, CancelCommand, RobloxDown, Error, UserNotVerified) # pylint: disable=import-error, no-name-in-module
@@ -16,6 +17,9 @@ eval = Bloxlink.get_module("evalm", attrs="__call__")
 post_event, suppress_timeout_errors = Bloxlink.get_module("utils", attrs=["post_event", "suppress_timeout_errors"])
 guild_obligations, get_user, get_nickname, format_update_embed = Bloxlink.get_module("roblox", attrs=["guild_obligations", "get_user", "get_nickname", "format_update_embed"])
 get_guild_value = Bloxlink.get_module("cache", attrs="get_guild_value")
+get_queue_depths = Bloxlink.get_module("ratelimits", attrs="get_queue_depths")
+reload_blacklist = Bloxlink.get_module("blacklist", attrs="reload_blacklist")
+clear_premium = Bloxlink.get_module("premium", attrs="clear_premium")
 
 
 
@@ -380,6 +384,69 @@ class IPC(Bloxlink.Module):
 
             await self.redis.publish(f"{RELEASE}:CLUSTER_{original_cluster}", response_data)
 
+        elif type == "BLACKLIST":
+            # data is the new blacklist; if it's empty, re-read our blacklist file
+            await reload_blacklist(data or None)
+
+            if nonce:
+                response_data = json.dumps({
+                    "nonce": nonce,
+                    "cluster_id": CLUSTER_ID,
+                    "data": True,
+                    "type": "CLIENT_RESULT",
+                    "original_cluster": original_cluster,
+                    "waiting_for": waiting_for
+                })
+
+                await self.redis.publish(f"{RELEASE}:CLUSTER_{original_cluster}", response_data)
+
+        elif type == "PREMIUM":
+            # sent by billing when a subscription changes
+            await clear_premium(guild_id=extras.get("guild_id"), user_id=extras.get("user_id"))
+
+        elif type == "CARD_BACKGROUNDS":
+            # backgrounds were added or changed on the image server
+            Card.clear_backgrounds()
+
+        elif type == "QUEUE_DEPTHS":
+            guild_id = extras.get("guild_id")
+
+            response_data = json.dumps({
+                "nonce": nonce,
+                "cluster_id": CLUSTER_ID,
+                "data": get_queue_depths(guild_id and int(guild_id)),
+                "type": "CLIENT_RESULT",
+                "original_cluster": original_cluster,
+                "waiting_for": waiting_for
+            })
+
+            await self.redis.publish(f"{RELEASE}:CLUSTER_{original_cluster}", response_data)
+
+        elif type == "DB_PROFILE":
+            # only available when the cluster was started with DB_PROFILER=true
+            db_profiler = Bloxlink.db_profiler
+            profile = None
+
+            if db_profiler:
+                profile = {
+                    "shapes": db_profiler.top_shapes(extras.get("limit", 10)),
+                    "indexes": await db_profiler.suggest_indexes(self.db)
+                }
+
+                if extras.get("reset"):
+                    db_profiler.reset()
+
+            response_data = json.dumps({
+                "nonce": nonce,
+                "cluster_id": CLUSTER_ID,
+                "data": profile,
+                "type": "CLIENT_RESULT",
+                "original_cluster": original_cluster,
+                "waiting_for": waiting_for
+            })
+
+            await self.redis.publish(f"{RELEASE}:CLUSTER_{original_cluster}", response_data)
+
         elif type == "PLAYING_STATUS":
             presence_type = extras.get("presence_type", "normal")
             playing_status = extras.get("status", PLAYING_STATUS)
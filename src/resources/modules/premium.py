@@ -1,14 +1,16 @@
 from ..structures import Bloxlink, DonatorProfile # pylint: disable=import-error, no-name-in-module
+from ..constants import PREMIUM_CACHE_TTL, PREMIUM_CACHE_SIZE, PATRONS_SYNC_INTERVAL, PATRONS_FULL_SYNC_EVERY, PATRONS_BATCH_SIZE # pylint: disable=import-error, no-name-in-module
 from discord import Object
 import discord
 import datetime
+import asyncio
 
 from time import time
 
 
 
 fetch = Bloxlink.get_module("utils", attrs="fetch")
-get_db_value, set_db_value, get_user_value, set_user_value, cache_get, cache_set = Bloxlink.get_module("cache", attrs=["get_db_value", "set_db_value", "get_user_value", "set_user_value", "get", "set"])
+get_db_value, set_db_value, get_user_value, set_user_value, cache_get, cache_set, cache_pop = Bloxlink.get_module("cache", attrs=["get_db_value", "set_db_value", "get_user_value", "set_user_value", "get", "set", "pop"])
 
 
 
@@ -33,19 +35,92 @@ class OldPremiumView(discord.ui.View):
 @Bloxlink.module
 class Premium(Bloxlink.Module):
     def __init__(self):
-        self.patrons = {}
+        self.patrons = set()
+        self.patrons_updated_at = None
+        self.premium_cache = {} # ("guilds", guild id, user id) or ("users", user id) -> (expiry, DonatorProfile)
+
+    async def __setup__(self):
+        syncs = 0
+
+        while True:
+            try:
+                # deltas can't see removed patrons, so do a full load every so often
+                await self.update_patrons(full=syncs % PATRONS_FULL_SYNC_EVERY == 0)
+            except Exception as e: # pylint: disable=broad-except
+                Bloxlink.log(f"ERROR | Failed to update patrons: {e}")
+            else:
+                syncs += 1
+
+            await asyncio.sleep(PATRONS_SYNC_INTERVAL)
+
+    async def update_patrons(self, full=False):
+        """loads the patron IDs. a full load replaces the set; otherwise only patrons updated
+        since the last load are added."""
+
+        if full or not self.patrons_updated_at:
+            query = {}
+            patrons = set()
+        else:
+            # $gte so patrons written in the same instant as the watermark, after the last load, aren't missed.
+            # the set ignores the ones that were already loaded
+            query = {"updatedAt": {"$gte": self.patrons_updated_at}}
+            patrons = self.patrons
 
-        Bloxlink.loop.create_task(self.update_patrons())
+        updated_at = self.patrons_updated_at
 
-    async def update_patrons(self):
-        cursor = self.db.patreon.find({})
+        async for patron in self.db.patreon.find(query, {"_id": 1, "updatedAt": 1}, batch_size=PATRONS_BATCH_SIZE):
+            try:
+                patrons.add(int(patron["_id"]))
+            except (TypeError, ValueError):
+                continue
 
-        while await cursor.fetch_next:
-            patron = cursor.next_object()
-            self.patrons[patron["_id"]] = True
+            patron_updated_at = patron.get("updatedAt")
+
+            if patron_updated_at and (not updated_at or patron_updated_at > updated_at):
+                updated_at = patron_updated_at
+
+        self.patrons = patrons
+        self.patrons_updated_at = updated_at
 
     async def has_premium(self, guild=None, user=None):
-        premium_data = await get_db_value("guilds" if guild else "users", guild or user, "premium") or {}
+        """resolves the DonatorProfile of the guild or user. profiles are cached for PREMIUM_CACHE_TTL seconds."""
+
+        cache_key = ("guilds", guild.id, user and user.id) if guild else ("users", user.id)
+        cached = self.premium_cache.get(cache_key)
+        now = time()
+
+        if cached and cached[0] > now:
+            return cached[1]
+
+        donator_profile = await self.resolve_premium(guild=guild, user=user)
+
+        if len(self.premium_cache) >= PREMIUM_CACHE_SIZE:
+            self.premium_cache = {k: v for k, v in self.premium_cache.items() if v[0] > now}
+
+        self.premium_cache[cache_key] = (now + PREMIUM_CACHE_TTL, donator_profile)
+
+        return donator_profile
+
+    async def clear_premium(self, guild_id=None, user_id=None):
+        """forgets the cached premium of the guild and/or user so it's resolved again from the database.
+        a guild's premium can come from its owner, so clearing a user clears every cached guild too."""
+
+        if guild_id:
+            self.premium_cache = {k: v for k, v in self.premium_cache.items() if k[:2] != ("guilds", int(guild_id))}
+            await cache_pop(f"guilds_data:{guild_id}:premium")
+
+        if user_id:
+            self.premium_cache = {k: v for k, v in self.premium_cache.items() if k != ("users", int(user_id)) and k[0] != "guilds"}
+            await cache_pop(f"users_data:{user_id}:premium")
+
+    async def resolve_premium(self, guild=None, user=None):
+        if guild:
+            # the owner's premium is needed if the guild doesn't have its own, so look both up at once
+            premium_data, user_premium_data = await asyncio.gather(get_db_value("guilds", guild, "premium"), get_user_value(user or Object(guild.owner_id), "premium"))
+            premium_data = premium_data or {}
+        else:
+            premium_data = user_premium_data = await get_db_value("users", user, "premium") or {}
+
         tier = None
         term = None
         user_facing_tier = None
@@ -84,21 +159,24 @@ class Premium(Bloxlink.Module):
 
         else:
             # check patreon and selly
-            return await self.check_old_premium(guild=guild, user=user)
+            return await self.check_old_premium(guild=guild, user=user, prem_data=user_premium_data)
 
-    async def check_old_premium(self, guild=None, user=None):
+    async def check_old_premium(self, guild=None, user=None, prem_data=None):
         if not user:
             user = Object(guild.owner_id)
 
-        prem_data = await get_user_value(user, "premium") or {}
+        prem_data = prem_data if prem_data is not None else await get_user_value(user, "premium")
+        prem_data = prem_data or {}
 
         if prem_data.get("transferFrom"):
             user = Object(int(prem_data["transferFrom"]))
+            prem_data = None
 
-        return await self.has_patreon_premium(user) or await self.has_selly_premium(user) or DonatorProfile(user=user)
+        return await self.has_patreon_premium(user) or await self.has_selly_premium(user, prem_data) or DonatorProfile(user=user)
 
-    async def has_selly_premium(self, user):
-        prem_data = await get_user_value(user, "premium") or {}
+    async def has_selly_premium(self, user, prem_data=None):
+        prem_data = prem_data if prem_data is not None else await get_user_value(user, "premium")
+        prem_data = prem_data or {}
 
         expiry = prem_data.get("expiry", 1)
         pro_expiry = prem_data.get("pro", 1)
@@ -124,7 +202,7 @@ class Premium(Bloxlink.Module):
             )
 
     async def has_patreon_premium(self, user):
-        if self.patrons.get(str(user.id)):
+        if int(user.id) in self.patrons:
             return DonatorProfile(
                 user=user,
                 typex="patreon",
@@ -171,6 +249,7 @@ class Premium(Bloxlink.Module):
                 user_data_premium["pro"] = 1
 
         await set_user_value(user, premium=user_data_premium)
+        await self.clear_premium(user_id=user.id)
 
 
     async def get_features(self, user=None, guild=None, cache=True, cache_as_guild=True, rec=True, premium_data=None, partner_check=True):
@@ -0,0 +1,148 @@
+from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
+from ..constants import REQUEST_PRIORITY # pylint: disable=import-error, no-name-in-module
+import asyncio
+import itertools
+import time
+
+
+# approximate Discord route buckets: (requests, per seconds). discord.py still
+# handles any 429s; these only pace requests so we don't hit them in the first place.
+ROUTE_BUCKETS = {
+    "member_edit":   (10, 10),  # PATCH /guilds/{guild.id}/members/{user.id}
+    "member_remove": (5, 5),    # kicks and bans
+    "role_create":   (5, 5),    # POST /guilds/{guild.id}/roles
+    "dm":            (5, 5),    # DM channel creation + sends
+    "webhook":       (5, 2),    # POST /webhooks/{webhook.id}/{webhook.token}
+}
+
+
+class RouteBucket:
+    __slots__ = ("limit", "per", "tokens", "updated", "queue", "worker", "depths")
+
+    def __init__(self, limit, per):
+        self.limit = limit
+        self.per = per
+        self.tokens = limit
+        self.updated = time.monotonic()
+        self.queue = asyncio.PriorityQueue()
+        self.worker = None
+        self.depths = {}
+
+    def delay(self):
+        """returns how long to wait before the next request may be sent"""
+
+        now = time.monotonic()
+        self.tokens = min(self.limit, self.tokens + (now - self.updated) * (self.limit / self.per))
+        self.updated = now
+
+        # the token is taken even when the request has to wait for it, so tokens can go
+        # negative and each waiter is paced behind the ones before it
+        self.tokens -= 1
+
+        if self.tokens >= 0:
+            return 0
+
+        return -self.tokens * (self.per / self.limit)
+
+
+@Bloxlink.module
+class RateLimits(Bloxlink.Module):
+    def __init__(self):
+        self.buckets = {}
+        self.counter = itertools.count()
+
+    async def schedule(self, route, major_id, fn, *args, priority=REQUEST_PRIORITY["BULK"], guild_id=None, **kwargs):
+        """queues fn(*args, **kwargs) in the bucket for (route, major_id) and waits for its result.
+        lower priorities run first; requests are paced so the bucket is never exhausted."""
+
+        bucket_key = (route, major_id)
+        bucket = self.buckets.get(bucket_key)
+
+        if not bucket:
+            bucket = self.buckets[bucket_key] = RouteBucket(*ROUTE_BUCKETS[route])
+
+        guild_id = guild_id or major_id
+        future = self.loop.create_future()
+
+        bucket.depths[guild_id] = bucket.depths.get(guild_id, 0) + 1
+        bucket.queue.put_nowait((priority, next(self.counter), future, guild_id, fn, args, kwargs))
+
+        if not bucket.worker or bucket.worker.done():
+            bucket.worker = self.loop.create_task(self.process_bucket(bucket_key, bucket))
+
+        return await future
+
+    async def process_bucket(self, bucket_key, bucket):
+        try:
+            while True:
+                try:
+                    # keep the bucket around until it has fully refilled so bursts stay paced
+                    _, _, future, guild_id, fn, args, kwargs = await asyncio.wait_for(bucket.queue.get(), bucket.per)
+                except asyncio.TimeoutError:
+                    if bucket.queue.empty():
+                        break
+
+                    continue
+
+                try:
+                    if future.cancelled():
+                        continue
+
+                    delay = bucket.delay()
+
+                    if delay:
+                        await asyncio.sleep(delay)
+
+                    # run the request in its own task so a CancelledError from it only fails this request
+                    request = asyncio.ensure_future(fn(*args, **kwargs))
+
+                    try:
+                        await asyncio.wait((request,))
+                    except asyncio.CancelledError:
+                        request.cancel()
+                        future.cancel()
+                        raise
+
+                    if future.done():
+                        pass
+                    elif request.cancelled():
+                        future.cancel()
+                    elif request.exception():
+                        future.set_exception(request.exception())
+                    else:
+                        future.set_result(request.result())
+
+                finally:
+                    depth = bucket.depths.get(guild_id, 1) - 1
+
+                    if depth:
+                        bucket.depths[guild_id] = depth
+                    else:
+                        bucket.depths.pop(guild_id, None)
+
+        except asyncio.CancelledError:
+            # the worker is going away, so nothing would ever resolve the requests still queued
+            while not bucket.queue.empty():
+                bucket.queue.get_nowait()[2].cancel()
+
+            raise
+
+        finally:
+            if self.buckets.get(bucket_key) is bucket:
+                self.buckets.pop(bucket_key, None)
+
+    def get_queue_depths(self, guild_id=None):
+        """returns the number of queued requests per route, optionally for a single guild"""
+
+        depths = {}
+
+        for (route, _), bucket in self.buckets.items():
+            if guild_id is None:
+                depth = sum(bucket.depths.values())
+            else:
+                depth = bucket.depths.get(guild_id, 0)
+
+            if depth:
+                depths[route] = depths.get(route, 0) + depth
+
+        return depths
@@ -1,20 +1,23 @@
 from ..structures.Bloxlink import Bloxlink # pylint: disable=no-name-in-module, import-error
 from ..structures.Card import Card # pylint: disable=no-name-in-module, import-error
 from ..exceptions import (BadUsage, RobloxAPIError, Error, CancelCommand, UserNotVerified,# pylint: disable=no-name-in-module, import-error
-                           RobloxNotFound, PermissionError, BloxlinkBypass, RobloxDown, Blacklisted)
+                           RobloxNotFound, PermissionError, BloxlinkBypass, RobloxDown, Blacklisted, BloxlinkException)
 from typing import Tuple
 import discord
 from datetime import datetime
 from config import REACTIONS # pylint: disable=import-error, no-name-in-module
 from ..constants import (BLOXLINK_STAFF, RELEASE, DEFAULTS,SERVER_INVITE, GREEN_COLOR, # pylint: disable=import-error, no-name-in-module
-                         RED_COLOR, VERIFY_URL, IGNORED_SERVERS) # pylint: disable=import-error, no-name-in-module
+                         RED_COLOR, VERIFY_URL, IGNORED_SERVERS, PENDING_VERIFICATIONS_LIMIT, REQUEST_PRIORITY,
+                         ROBLOX_DETAILS_TIMEOUT, DEVFORUM_PROFILE_TTL, DEVFORUM_MISSING_TTL, UPDATE_FINGERPRINT_TTL, LAST_UPDATED_TTL, USER_SCOPE_TTLS) # pylint: disable=import-error, no-name-in-module
 import json
+import hashlib
 import re
 import asyncio
 import dateutil.parser as parser
 import math
 import traceback
 import uuid
+import time
 
 
 nickname_template_regex = re.compile(r"\{(.*?)\}")
@@ -29,8 +32,16 @@ has_premium = Bloxlink.get_module("premium", attrs=["has_premium"])
 cache_set, cache_get, cache_pop, get_guild_value, get_db_value, get_user_value, set_db_value, set_user_value = Bloxlink.get_module("cache", attrs=["set", "get", "pop", "get_guild_value", "get_db_value", "get_user_value", "set_db_value", "set_user_value"])
 check_restrictions = Bloxlink.get_module("blacklist", attrs=["check_restrictions"])
 has_magic_role = Bloxlink.get_module("extras", attrs=["has_magic_role"])
+schedule = Bloxlink.get_module("ratelimits", attrs=["schedule"])
+clear_discord_profile, get_cached, set_cached, pop_cached = Bloxlink.get_module("robloxnew.users", attrs=["clear_discord_profile", "get_cached", "set_cached", "pop_cached"], name_override="users")
 
 
+USER_FIELDS = ("username", "id", "discord_id", "verified", "complete", "more_details", "avatar", "premium", "presence",
+               "badges", "description", "banned", "age", "created", "join_date", "profile_link", "dev_forum", "display_name",
+               "full_join_string", "group_ranks", "overlay", "age_string", "flags", "synced_at")
+GROUP_FIELDS = ("group_id", "name", "description", "rolesets", "owner", "member_count", "emblem_url", "url",
+                "user_rank_name", "user_rank_id", "shout")
+
 API_URL = "https://api.roblox.com"
 BASE_URL = "https://www.roblox.com"
 GROUP_API = "https://groups.roblox.com"
@@ -68,7 +79,7 @@ class Roblox(Bloxlink.Module):
 
     @staticmethod
     async def get_roblox_username(roblox_id) -> Tuple[str, str]:
-        roblox_user = await cache_get(f"roblox_users:{roblox_id}")
+        roblox_user = await get_cached(f"roblox_users:{roblox_id}", RobloxUser)
 
         if roblox_user and roblox_user.verified:
             return roblox_user.id, roblox_user.username
@@ -224,7 +235,8 @@ class Roblox(Bloxlink.Module):
 
         await set_user_value(user, **set_options)
 
-        await cache_pop(f"discord_profiles:{user_id}")
+        await pop_cached(f"discord_profiles:{user_id}")
+        await clear_discord_profile(user_id)
 
     async def unverify_member(self, user, roblox):
         user_id = str(user.id)
@@ -236,7 +248,7 @@ class Roblox(Bloxlink.Module):
         else:
             roblox_id = str(roblox)
 
-        await check_restrictions("users", user.id) or await check_restrictions("robloxAccounts", roblox_id)
+        await check_restrictions(users=[user.id], robloxAccounts=[roblox_id])
 
         options = await get_user_value(user, ["robloxAccounts", {}], "robloxID")
         roblox_accounts = options.get("robloxAccounts", {})
@@ -292,7 +304,8 @@ class Roblox(Bloxlink.Module):
 
         await set_user_value(user, **set_options)
 
-        await cache_pop(f"discord_profiles:{user_id}")
+        await pop_cached(f"discord_profiles:{user_id}")
+        await clear_discord_profile(user_id)
 
         return success
 
@@ -538,18 +551,91 @@ class Roblox(Bloxlink.Module):
         return role_binds, group_ids
 
 
-    async def guild_obligations(self, member, guild, join=None, cache=True, dm=False, event=False, response=None, exceptions=None, roles=True, nickname=True, roblox_user=None):
+    async def guild_obligations(self, member, guild, join=None, cache=True, dm=False, event=False, response=None, exceptions=None, roles=True, nickname=True, roblox_user=None, priority=REQUEST_PRIORITY["INTERACTIVE"]):
+        """runs the verification obligations for the member. concurrent calls for the same
+        (guild, member) share one in-flight task instead of duplicating the work; the task
+        runs with the first caller's options, and later callers only receive its result."""
+
         if member.bot:
             raise CancelCommand()
 
         if guild.id in IGNORED_SERVERS:
             raise CancelCommand()
 
-        if self.pending_verifications.get(member.id):
-            raise CancelCommand("You are already queued for verification. This process can take a while depending on the size of the server due to Discord rate-limits.")
+        exceptions = exceptions or ()
+        pending_key = (guild.id, member.id)
+        task = self.pending_verifications.get(pending_key)
+        joined = task is not None
+
+        if not task:
+            if len(self.pending_verifications) >= PENDING_VERIFICATIONS_LIMIT:
+                raise CancelCommand("Bloxlink is too busy to update you right now. Please try again in a few minutes.")
+
+            task = self.loop.create_task(self._guild_obligations(pending_key, member, guild, join=join, cache=cache, dm=dm, event=event, response=response,
+                                                                 exceptions=exceptions, roles=roles, nickname=nickname, roblox_user=roblox_user, priority=priority))
+            self.pending_verifications[pending_key] = task
+
+            def finish_verification(task):
+                # retrieves the exception so it isn't reported as unretrieved when every caller was cancelled
+                failed = task.cancelled() or task.exception()
+
+                if join is False:
+                    # the member left the guild
+                    self.loop.create_task(self.set_last_updated(guild.id, member.id, None))
+                elif not failed:
+                    self.loop.create_task(self.set_last_updated(guild.id, member.id, time.time()))
+
+            task.add_done_callback(finish_verification)
+
+        if not joined:
+            return await asyncio.shield(task)
+
+        # the shared task raised and sent DMs according to the first caller's options, so
+        # filter its outcome by this caller's exceptions instead
+        try:
+            result = await asyncio.shield(task)
+        except CancelCommand:
+            raise
+        except BloxlinkException as e:
+            if e.__class__.__name__ not in exceptions:
+                raise CancelCommand() from None
+
+            raise
+
+        if result and result[5] is None and "UserNotVerified" in exceptions:
+            raise UserNotVerified
+
+        return result
+
+    async def set_last_updated(self, guild_id, member_id, updated_at):
+        """records when the member was last updated, or forgets them if updated_at is None. kept
+        in redis so every cluster shares it and it survives restarts."""
+
+        if not self.redis:
+            return
+
+        redis_key = f"last_updated:{guild_id}"
+
+        try:
+            if updated_at is None:
+                await self.redis.hdel(redis_key, str(member_id))
+            else:
+                await self.redis.hset(redis_key, str(member_id), updated_at)
+                await self.redis.expire(redis_key, LAST_UPDATED_TTL)
+        except Exception as e: # pylint: disable=broad-except
+            Bloxlink.log(f"ERROR | Failed to record the last update of {member_id}: {e}")
+
+    async def get_last_updated(self, guild_id, member_ids):
+        """returns {member id: when they were last updated} for the members that have been updated"""
+
+        if not (self.redis and member_ids):
+            return {}
+
+        updated_at = await self.redis.hmget(f"last_updated:{guild_id}", [str(member_id) for member_id in member_ids])
 
-        self.pending_verifications[member.id] = True
+        return {member_id: float(member_updated) for member_id, member_updated in zip(member_ids, updated_at) if member_updated}
 
+    async def _guild_obligations(self, pending_key, member, guild, join=None, cache=True, dm=False, event=False, response=None, exceptions=None, roles=True, nickname=True, roblox_user=None, priority=REQUEST_PRIORITY["INTERACTIVE"]):
         try:
             roblox_user = None
             accounts = []
@@ -719,12 +805,12 @@ class Roblox(Bloxlink.Module):
                                             else:
                                                 if dm:
                                                     try:
-                                                        await member.send(f"This server ({guild.name}) forbids the use of alterantive accounts, so your old account has been removed from the server.")
+                                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"This server ({guild.name}) forbids the use of alterantive accounts, so your old account has been removed from the server.")
                                                     except discord.errors.Forbidden:
                                                         pass
 
                                                 try:
-                                                    await user_find.kick(reason=f"disallowAlts is enabled - alt of {member} ({member.id})")
+                                                    await schedule("member_remove", guild.id, user_find.kick, priority=priority, reason=f"disallowAlts is enabled - alt of {member} ({member.id})")
                                                 except discord.errors.Forbidden:
                                                     pass
                                                 else:
@@ -745,12 +831,12 @@ class Roblox(Bloxlink.Module):
 
                                                 if dm:
                                                     try:
-                                                        await member.send(f"This server ({guild.name}) forbids ban-evaders, and as you have a banned account in the server, you have been {action_participle}.")
+                                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"This server ({guild.name}) forbids ban-evaders, and as you have a banned account in the server, you have been {action_participle}.")
                                                     except discord.errors.Forbidden:
                                                         pass
 
                                                 try:
-                                                    await ((getattr(guild, action))(member, reason=f"disallowBanEvaders is enabled - alt of {ban_entry.user} ({ban_entry.user.id})"))
+                                                    await schedule("member_remove", guild.id, getattr(guild, action), member, priority=priority, reason=f"disallowBanEvaders is enabled - alt of {ban_entry.user} ({ban_entry.user.id})")
                                                 except (discord.errors.Forbidden, discord.errors.HTTPException):
                                                     pass
                                                 else:
@@ -769,7 +855,8 @@ class Roblox(Bloxlink.Module):
                         roblox_user             = roblox_user,
                         cache                   = cache,
                         dm                      = dm,
-                        response                = response)
+                        response                = response,
+                        priority                = priority)
 
                 except discord.errors.NotFound as e:
                     if "NotFound" in exceptions:
@@ -811,7 +898,7 @@ class Roblox(Bloxlink.Module):
                         if age_limit > roblox_user.age:
                             if dm:
                                 try:
-                                    await member.send(f"_Bloxlink Age-Limit_\nYou were kicked from **{guild.name}** for not being at least "
+                                    await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"_Bloxlink Age-Limit_\nYou were kicked from **{guild.name}** for not being at least "
                                                     f"`{age_limit}` days old on your Roblox account `{roblox_user.username}` (days={roblox_user.age}). If this is a mistake, "
                                                     f"then please join {SERVER_INVITE} and link a different account with `/verify`. "
                                                     f"Finally, use the `/switchuser` command and provide this ID to the command: `{guild.id}`")
@@ -819,7 +906,7 @@ class Roblox(Bloxlink.Module):
                                     pass
 
                             try:
-                                await member.kick(reason=f"AGE-LIMIT: user age {roblox_user.age} < {age_limit}")
+                                await schedule("member_remove", guild.id, member.kick, priority=priority, reason=f"AGE-LIMIT: user age {roblox_user.age} < {age_limit}")
                             except discord.errors.Forbidden:
                                 pass
                             else:
@@ -868,13 +955,13 @@ class Roblox(Bloxlink.Module):
                                     else:
                                         if dm:
                                             try:
-                                                await member.send(dm_message, view=view)
+                                                await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=dm_message, view=view)
                                             except discord.errors.Forbidden:
                                                 pass
 
                                         if group_lock_action == "kick":
                                             try:
-                                                await member.kick(reason=f"SERVER-LOCK: doesn't have the allowed roleset(s) for group {group_id}")
+                                                await schedule("member_remove", guild.id, member.kick, priority=priority, reason=f"SERVER-LOCK: doesn't have the allowed roleset(s) for group {group_id}")
                                             except discord.errors.Forbidden:
                                                 pass
                                             else:
@@ -887,13 +974,13 @@ class Roblox(Bloxlink.Module):
                             else:
                                 if dm:
                                     try:
-                                        await member.send(dm_message, view=view)
+                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=dm_message, view=view)
                                     except discord.errors.Forbidden:
                                         pass
 
                                 if group_lock_action == "kick":
                                     try:
-                                        await member.kick(reason=f"SERVER-LOCK: not in group {group_id}")
+                                        await schedule("member_remove", guild.id, member.kick, priority=priority, reason=f"SERVER-LOCK: not in group {group_id}")
                                     except discord.errors.Forbidden:
                                         pass
                                     else:
@@ -919,7 +1006,7 @@ class Roblox(Bloxlink.Module):
                         )
 
                         try:
-                            msg = await member.send(verified_dm, files=[card.front_card_file] if card else None, view=card.view if card else view, embed=embed)
+                            msg = await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=verified_dm, files=[card.front_card_file] if card else None, view=card.view if card else view, embed=embed)
                         except (discord.errors.Forbidden, discord.errors.HTTPException):
                             pass
                         else:
@@ -940,10 +1027,10 @@ class Roblox(Bloxlink.Module):
                             if dm:
                                 try:
                                     if accounts:
-                                        await member.send(f"_Bloxlink Server-Lock_\nYou have no primary account set! Please go to <{VERIFY_URL}> and set a "
+                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"_Bloxlink Server-Lock_\nYou have no primary account set! Please go to <{VERIFY_URL}> and set a "
                                                           "primary account, then try rejoining this server.")
                                     else:
-                                        await member.send(f"_Bloxlink Server-Lock_\nYou were kicked from **{guild.name}** for not being linked to Bloxlink.\n"
+                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"_Bloxlink Server-Lock_\nYou were kicked from **{guild.name}** for not being linked to Bloxlink.\n"
                                                           f"You may link your account to Bloxlink by visiting <{VERIFY_URL}> and completing the verification process.\n"
                                                           "Stuck? Watch this video: <https://youtu.be/0SH3n8rY9Fg>\n"
                                                           f"Join {SERVER_INVITE} for additional help.")
@@ -951,7 +1038,7 @@ class Roblox(Bloxlink.Module):
                                     pass
 
                             try:
-                                await member.kick(reason=f"AGE-LIMIT: user not linked to Bloxlink")
+                                await schedule("member_remove", guild.id, member.kick, priority=priority, reason=f"AGE-LIMIT: user not linked to Bloxlink")
                             except discord.errors.Forbidden:
                                 pass
                             else:
@@ -972,16 +1059,16 @@ class Roblox(Bloxlink.Module):
 
                             try:
                                 if accounts:
-                                    await member.send(f"You have no primary account set! Please go to <{VERIFY_URL}> and set a "
+                                    await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"You have no primary account set! Please go to <{VERIFY_URL}> and set a "
                                                       "primary account, then try rejoining this server.")
                                 else:
                                     if should_kick_unverified:
-                                        await member.send(f"You were kicked from **{guild.name}** for not being linked to Bloxlink.\n\n"
+                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"You were kicked from **{guild.name}** for not being linked to Bloxlink.\n\n"
                                                           f"**How to fix this:** Go to <" + VERIFY_URL + "> to verify with Bloxlink.\n\n"
                                                           "**Stuck? Watch this video:** <https://www.youtube.com/watch?v=mSbD91Zug5k&t=0s>\n\n"
                                                           f"Join {SERVER_INVITE} for additional help.")
                                     else:
-                                        await member.send(f"{guild.name} requires that you verify with Bloxlink in order to access the rest of the server.\n\n"
+                                        await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=f"{guild.name} requires that you verify with Bloxlink in order to access the rest of the server.\n\n"
                                                           f"**How to fix this:** Go to <" + VERIFY_URL + "> to verify with Bloxlink.")
 
                             except discord.errors.Forbidden:
@@ -989,7 +1076,7 @@ class Roblox(Bloxlink.Module):
 
                         if should_kick_unverified:
                             try:
-                                await member.kick(reason="GROUP-LOCK: not linked to Bloxlink")
+                                await schedule("member_remove", guild.id, member.kick, priority=priority, reason="GROUP-LOCK: not linked to Bloxlink")
                             except discord.errors.Forbidden:
                                 pass
                             else:
@@ -1001,7 +1088,7 @@ class Roblox(Bloxlink.Module):
                         unverified_dm = await self.get_nickname(member, unverified_dm, skip_roblox_check=True, dm=dm, is_nickname=False)
 
                         try:
-                            await member.send(unverified_dm)
+                            await schedule("dm", member.id, member.send, guild_id=guild.id, priority=priority, content=unverified_dm)
                         except (discord.errors.Forbidden, discord.errors.HTTPException):
                             pass
 
@@ -1026,7 +1113,7 @@ class Roblox(Bloxlink.Module):
                 raise UserNotVerified
 
         finally:
-            self.pending_verifications.pop(member.id, None)
+            self.pending_verifications.pop(pending_key, None)
 
     # async def get_binds_for_user(self, user, guild, *, guild_data=None, roblox_user=None, cache=False):
     #     """return the required and optional binds for the user"""
@@ -1229,8 +1316,47 @@ class Roblox(Bloxlink.Module):
     #     print(required_binds)
     #     print(optional_binds)
 
-    async def update_member(self, user, guild, *, nickname=True, roles=True, group_roles=True, roblox_user=None, binds=None, response=None, dm=False, cache=True):
-        await check_restrictions("users", user.id, guild=guild)
+    async def get_update_fingerprint(self, user, guild, roblox_user, role_binds, group_ids, options, *, roles, nickname, member_roles, display_name):
+        """hashes everything the outcome of update_member depends on. returns None if the
+        outcome can't be known without re-evaluating, e.g. for item binds which need a
+        request to check ownership, or for a user whose details only partially loaded."""
+
+        if roblox_user.missing_details:
+            return None
+
+        if any(role_binds.get(category) for category in ("assets", "badges", "gamePasses")):
+            return None
+
+        guild_settings = await get_guild_value(guild, ["dynamicRoles", DEFAULTS.get("dynamicRoles")], ["shorterNicknames", DEFAULTS.get("shorterNicknames")])
+        bind_plan = json.dumps([role_binds, group_ids, options, guild_settings], sort_keys=True, default=str)
+
+        if "clan-tag" in bind_plan:
+            return None
+
+        dev_forum_trust_level = None
+
+        if role_binds.get("devForum") or role_binds.get("robloxStaff"):
+            roblox_user.dev_forum = roblox_user.dev_forum or await self.get_dev_forum_profile(roblox_user.id)
+            dev_forum_trust_level = roblox_user.dev_forum and roblox_user.dev_forum.get("trust_level")
+
+        relevant_groups = sorted({*role_binds.get("groups", {}), *group_ids, *any_group_nickname.findall(bind_plan)})
+        group_ranks = [(group_id, group.user_rank_id, group.user_rank_name) if group else (group_id, None, None)
+                       for group_id, group in ((group_id, roblox_user.groups.get(group_id)) for group_id in relevant_groups)]
+
+        fingerprint_data = json.dumps([
+            bind_plan,
+            group_ranks,
+            dev_forum_trust_level,
+            [roblox_user.id, roblox_user.username, roblox_user.display_name, roblox_user.age, roblox_user.join_date],
+            [user.name, guild.name, roles, nickname],
+            [[role.id, role.name, role.position, role.managed] for role in guild.roles],
+            [sorted(member_roles), display_name]
+        ], default=str)
+
+        return hashlib.sha256(fingerprint_data.encode("utf-8")).hexdigest()
+
+    async def update_member(self, user, guild, *, nickname=True, roles=True, group_roles=True, roblox_user=None, binds=None, response=None, dm=False, cache=True, priority=REQUEST_PRIORITY["INTERACTIVE"]):
+        await check_restrictions(guild=guild, users=[user.id])
 
         if not cache:
             await cache_pop(f"discord_profiles:{user.id}")
@@ -1345,7 +1471,7 @@ class Roblox(Bloxlink.Module):
 
             if not unverified_role:
                 try:
-                    unverified_role = await guild.create_role(name=unverified_role_name, reason="Creating missing Unverified role")
+                    unverified_role = await schedule("role_create", guild.id, guild.create_role, name=unverified_role_name, reason="Creating missing Unverified role", priority=priority)
                 except discord.errors.Forbidden:
                     raise PermissionError("I was unable to create the Unverified Role. Please "
                                           "ensure I have the `Manage Roles` permission.")
@@ -1362,9 +1488,10 @@ class Roblox(Bloxlink.Module):
 
             if not verified_role:
                 try:
-                    verified_role = await guild.create_role(
-                        name   = verified_role_name,
-                        reason = "Creating missing Verified role"
+                    verified_role = await schedule("role_create", guild.id, guild.create_role,
+                        name     = verified_role_name,
+                        reason   = "Creating missing Verified role",
+                        priority = priority
                     )
                 except discord.errors.Forbidden:
                     raise PermissionError("Sorry, I wasn't able to create the Verified role. "
@@ -1394,7 +1521,7 @@ class Roblox(Bloxlink.Module):
             unverified = True
 
         else:
-            await check_restrictions("robloxAccounts", roblox_user.id, guild=guild, roblox_user=roblox_user)
+            await check_restrictions(guild=guild, roblox_user=roblox_user, robloxAccounts=[roblox_user.id])
 
             if roles:
                 if unverified_role:
@@ -1405,6 +1532,28 @@ class Roblox(Bloxlink.Module):
                     add_roles.add(verified_role)
                     bind_explanations["success"].append(["verified role", None, None, "You are verified on Bloxlink.", [verified_role.name]])
 
+        fingerprint_key = f"update_fingerprints:{guild.id}:{user.id}"
+        fingerprint_args = None
+
+        if not unverified and group_roles and roblox_user:
+            if not (binds and len(binds) == 2 and binds[0] is not None and binds[1] is not None):
+                binds = await self.get_binds(guild)
+
+            fingerprint_args = (user, guild, roblox_user, binds[0], binds[1], options)
+            fingerprint_flags = {"roles": roles, "nickname": nickname}
+            fingerprint = await self.get_update_fingerprint(*fingerprint_args, **fingerprint_flags,
+                                                            member_roles=user._roles, display_name=user.display_name)
+
+            if fingerprint:
+                last_update = await self.redis.get(fingerprint_key)
+                last_update = last_update and json.loads(last_update)
+
+                if last_update and last_update["fingerprint"] == fingerprint:
+                    # nothing this update depends on changed since the member was last updated
+                    return [], [], last_update["nickname"], [], [], roblox_user, last_update["bind_explanations"]
+            else:
+                fingerprint_args = None
+
         if not unverified:
             if group_roles and roblox_user:
                 if binds and len(binds) == 2 and binds[0] is not None and binds[1] is not None:
@@ -1487,7 +1636,7 @@ class Roblox(Bloxlink.Module):
                                         bind_explanations["failure"].append([category_title.lower(), bind_id, bind_data.get("displayName"), f"You do not own this {category_title.lower()}.", explanation_roles])
 
                         elif category == "robloxStaff":
-                            devforum_data = roblox_user.dev_forum
+                            devforum_data = roblox_user.dev_forum = roblox_user.dev_forum or await self.get_dev_forum_profile(roblox_user.id)
 
                             if devforum_data and devforum_data.get("trust_level") == 4:
                                 await give_bind_stuff(all_binds)
@@ -1495,7 +1644,7 @@ class Roblox(Bloxlink.Module):
                                 await remove_bind_stuff(all_binds)
 
                         elif category == "devForum":
-                            devforum_data = roblox_user.dev_forum
+                            devforum_data = roblox_user.dev_forum = roblox_user.dev_forum or await self.get_dev_forum_profile(roblox_user.id)
 
                             if devforum_data and devforum_data.get("trust_level"):
                                 await give_bind_stuff(all_binds)
@@ -1723,7 +1872,7 @@ class Roblox(Bloxlink.Module):
                                     dynamic_roles = await get_guild_value(guild, ["dynamicRoles", DEFAULTS.get("dynamicRoles")])
                                     if dynamic_roles:
                                         try:
-                                            group_role = await guild.create_role(name=group.user_rank_name, reason="Creating missing group role")
+                                            group_role = await schedule("role_create", guild.id, guild.create_role, name=group.user_rank_name, reason="Creating missing group role", priority=priority)
                                         except discord.errors.Forbidden:
                                             raise PermissionError(f"Sorry, I wasn't able to create the role {group.user_rank_name}."
                                                                    "Please ensure I have the `Manage Roles` permission.")
@@ -1779,23 +1928,9 @@ class Roblox(Bloxlink.Module):
             remove_roles = remove_roles.difference(add_roles)
             add_roles = add_roles.difference(user.roles)
 
-            try:
-                for role in (*add_roles, *remove_roles):
-                    if role.position > me.top_role.position:
-                        raise PermissionError(f"Sorry, I can't add or remove roles above my highest role.\nPlease move the **{role}** role to a lower position or my highest role, **{me.top_role}**, higher.")
-
-                if add_roles:
-                    await user.add_roles(*add_roles, reason="Adding group roles")
-
-                if remove_roles:
-                    await user.remove_roles(*remove_roles, reason="Removing old roles")
-
-            except discord.errors.Forbidden:
-                raise PermissionError("I was unable to sufficiently add roles to the user. Please ensure that "
-                                      "I have the `Manage Roles` permission, and drag my role above the other roles. ")
-
-            except discord.errors.NotFound:
-                raise CancelCommand
+            for role in (*add_roles, *remove_roles):
+                if role.position > me.top_role.position:
+                    raise PermissionError(f"Sorry, I can't add or remove roles above my highest role.\nPlease move the **{role}** role to a lower position or my highest role, **{me.top_role}**, higher.")
 
         if nickname:
             if not unverified:
@@ -1812,22 +1947,79 @@ class Roblox(Bloxlink.Module):
                     nickname = top_role_nickname or await self.get_nickname(template=nickname_template, user=user, roblox_user=roblox_user, dm=dm, response=response)
 
                 if isinstance(nickname, bool):
-                    nickname = self.get_nickname(template=nickname_template, roblox_user=roblox_user, user=user, dm=dm, response=response)
+                    nickname = await self.get_nickname(template=nickname_template, roblox_user=roblox_user, user=user, dm=dm, response=response)
 
-            if nickname and nickname != user.display_name:
-                try:
-                    await user.edit(nick=nickname)
-                except discord.errors.Forbidden:
-                    if guild.owner_id == user.id:
-                        warnings.append("Since you're the Server Owner, I cannot edit your nickname. You may ignore this message; verification will work for normal users.")
-                    else:
-                        errors.append(f"I was unable to edit your nickname. Please ensure I have the Manage Nickname permission, and drag my role above the other roles.")
-                except discord.errors.NotFound:
-                    raise CancelCommand
+        edit_roles = roles and (add_roles or remove_roles)
+        edit_nickname = nickname and nickname != user.display_name
+
+        async def edit_roles_separately():
+            try:
+                if add_roles:
+                    await schedule("member_edit", guild.id, user.add_roles, *add_roles, reason="Adding group roles", priority=priority)
+
+                if remove_roles:
+                    await schedule("member_edit", guild.id, user.remove_roles, *remove_roles, reason="Removing old roles", priority=priority)
+
+            except discord.errors.Forbidden:
+                raise PermissionError("I was unable to sufficiently add roles to the user. Please ensure that "
+                                      "I have the `Manage Roles` permission, and drag my role above the other roles. ")
+
+            except discord.errors.NotFound:
+                raise CancelCommand
+
+        async def edit_nickname_separately():
+            try:
+                await schedule("member_edit", guild.id, user.edit, nick=nickname, priority=priority)
+            except discord.errors.Forbidden:
+                if guild.owner_id == user.id:
+                    warnings.append("Since you're the Server Owner, I cannot edit your nickname. You may ignore this message; verification will work for normal users.")
+                else:
+                    errors.append(f"I was unable to edit your nickname. Please ensure I have the Manage Nickname permission, and drag my role above the other roles.")
+            except discord.errors.NotFound:
+                raise CancelCommand
+
+        if edit_roles:
+            # one PATCH for roles and nickname so we only spend a single request from the member-modify bucket
+            member_edit = {"roles": [r for r in user.roles if not r.is_default() and r not in remove_roles] + list(add_roles)}
+
+            if edit_nickname:
+                member_edit["nick"] = nickname
+
+            try:
+                await schedule("member_edit", guild.id, user.edit, **member_edit, reason="Updating roles and nickname", priority=priority)
+            except discord.errors.Forbidden:
+                # redo the changes one at a time so the failure is attributed correctly
+                await edit_roles_separately()
+
+                if edit_nickname:
+                    await edit_nickname_separately()
+
+            except discord.errors.NotFound:
+                raise CancelCommand
+
+        elif edit_nickname:
+            await edit_nickname_separately()
 
         if unverified:
             raise UserNotVerified()
 
+        if fingerprint_args and not errors:
+            # save what the member looks like now, so the same update next time can be skipped
+            member_roles = {*user._roles}
+
+            if edit_roles:
+                member_roles = member_roles.difference(r.id for r in remove_roles).union(r.id for r in add_roles)
+
+            fingerprint = await self.get_update_fingerprint(*fingerprint_args, **fingerprint_flags,
+                                                            member_roles=member_roles, display_name=nickname if edit_nickname else user.display_name)
+
+            if fingerprint:
+                await self.redis.set(fingerprint_key, json.dumps({
+                    "fingerprint": fingerprint,
+                    "nickname": nickname,
+                    "bind_explanations": bind_explanations
+                }), ex=UPDATE_FINGERPRINT_TTL)
+
         if not roblox_user:
             roblox_user = (await self.get_user(user=user, guild=guild, everything=True))[0]
 
@@ -1901,6 +2093,39 @@ class Roblox(Bloxlink.Module):
         raise RobloxNotFound
 
 
+    @staticmethod
+    async def get_dev_forum_profile(roblox_id):
+        """returns the user's DevForum profile, or None if they have no account. both are
+        cached, with absent accounts kept for longer as most users don't have one."""
+
+        redis_key = f"devforum_profiles:{roblox_id}"
+        cached_profile = await Roblox.redis.get(redis_key)
+
+        if cached_profile is not None:
+            return json.loads(cached_profile) or None
+
+        try:
+            dev_forum_profile, http_response = await fetch(f"https://devforum.roblox.com/u/by-external/{roblox_id}.json", json=True, raise_on_failure=False, timeout=5, retry=0)
+        except (RobloxDown, RobloxAPIError):
+            return None
+
+        if http_response.status == 200:
+            dev_forum_profile = dev_forum_profile.get("user") or {}
+            dev_forum_profile = {
+                "username": dev_forum_profile.get("username"),
+                "title": dev_forum_profile.get("title"),
+                "trust_level": dev_forum_profile.get("trust_level")
+            }
+
+            await Roblox.redis.set(redis_key, json.dumps(dev_forum_profile), ex=DEVFORUM_PROFILE_TTL)
+
+            return dev_forum_profile
+
+        if http_response.status == 404:
+            await Roblox.redis.set(redis_key, json.dumps(None), ex=DEVFORUM_MISSING_TTL)
+
+        return None
+
     @staticmethod
     async def get_group(group_id, full_group=False):
         group_id = str(group_id)
@@ -1983,7 +2208,7 @@ class Roblox(Bloxlink.Module):
             user_id = str(user.id)
 
             if cache:
-                discord_profile = await cache_get(f"discord_profiles:{user_id}")
+                discord_profile = await get_cached(f"discord_profiles:{user_id}", DiscordProfile)
 
                 if discord_profile:
                     if guild:
@@ -2019,7 +2244,7 @@ class Roblox(Bloxlink.Module):
                 roblox_user = None
 
                 if cache:
-                    roblox_user = await cache_get(f"roblox_users:{roblox_account}")
+                    roblox_user = await get_cached(f"roblox_users:{roblox_account}", RobloxUser)
 
                 roblox_user = roblox_user or RobloxUser(roblox_id=roblox_account)
                 embed = await roblox_user.sync(*args, user=user, group_ids=group_ids, author=author, return_embed=return_embed, guild=guild, everything=everything, basic_details=basic_details)
@@ -2027,9 +2252,10 @@ class Roblox(Bloxlink.Module):
                 if guild:
                     discord_profile.guilds[guild_id] = roblox_user
 
-                if cache:
-                    await cache_set(f"discord_profiles:{user_id}", discord_profile)
-                    await cache_set(f"roblox_users:{roblox_account}", roblox_user)
+                # a partially loaded user would be reused as if it were complete
+                if cache and not roblox_user.missing_details:
+                    await set_cached(f"discord_profiles:{user_id}", discord_profile)
+                    await set_cached(f"roblox_users:{roblox_account}", roblox_user)
 
                 return roblox_user, accounts, embed
 
@@ -2046,16 +2272,18 @@ class Roblox(Bloxlink.Module):
                 roblox_id, username = await self.get_roblox_id(username)
 
             if roblox_id:
-                roblox_user = await cache_get(f"roblox_users:{roblox_id}")
+                roblox_user = await get_cached(f"roblox_users:{roblox_id}", RobloxUser)
+
+                cached = bool(roblox_user)
 
                 if not roblox_user:
                     roblox_user = RobloxUser(roblox_id=roblox_id)
 
-                    if cache:
-                        await cache_set(f"roblox_users:{roblox_id}", roblox_user)
-
                 embed = await roblox_user.sync(*args, user=user, author=author, group_ids=group_ids, guild=guild, return_embed=return_embed, everything=everything, basic_details=basic_details)
 
+                if cache and not cached and not roblox_user.missing_details:
+                    await set_cached(f"roblox_users:{roblox_id}", roblox_user)
+
                 return roblox_user, [], embed
 
             raise BadUsage("Unable to resolve a user")
@@ -2143,6 +2371,19 @@ class DiscordProfile:
     def __eq__(self, other):
         return self.id == getattr(other, "id", None)
 
+    def pack(self):
+        return [self.id, self.primary_account and self.primary_account.pack(), self.accounts,
+                [[guild_id, roblox_user.pack()] for guild_id, roblox_user in self.guilds.items()]]
+
+    @staticmethod
+    def unpack(packed_profile):
+        user_id, primary_account, accounts, guilds = packed_profile
+
+        return DiscordProfile(user_id,
+                              primary_account=primary_account and RobloxUser.unpack(primary_account),
+                              accounts=accounts,
+                              guilds={guild_id: RobloxUser.unpack(roblox_user) for guild_id, roblox_user in guilds})
+
 class Group(Bloxlink.Module):
     __slots__ = ("name", "group_id", "description", "rolesets", "owner", "member_count",
                  "emblem_url", "url", "user_rank_name", "user_rank_id", "shout")
@@ -2259,7 +2500,7 @@ class RobloxUser(Bloxlink.Module):
     __slots__ = ("username", "id", "discord_id", "verified", "complete", "more_details", "groups",
                  "avatar", "premium", "presence", "badges", "description", "banned", "age", "created",
                  "join_date", "profile_link", "session", "embed", "dev_forum", "display_name", "full_join_string",
-                 "group_ranks", "overlay", "age_string", "flags")
+                 "group_ranks", "overlay", "age_string", "flags", "missing_details", "synced_at")
 
     def __init__(self, *, username=None, roblox_id=None, discord_id=None, **kwargs):
         self.username = username
@@ -2270,6 +2511,8 @@ class RobloxUser(Bloxlink.Module):
         self.complete = False
         self.more_details = False
         self.partial = False
+        self.missing_details = set()
+        self.synced_at = {} # scope: when it was last fetched
 
         self.groups = kwargs.get("groups", {})
         self.avatar = kwargs.get("avatar")
@@ -2295,8 +2538,44 @@ class RobloxUser(Bloxlink.Module):
         self.age_string = None
         self.profile_link = roblox_id and f"https://www.roblox.com/users/{roblox_id}/profile"
 
+    def is_stale(self, scope):
+        synced_at = self.synced_at.get(scope)
+
+        return synced_at is None or time.time() - synced_at > USER_SCOPE_TTLS[scope]
+
+    def pack(self):
+        """returns the user as a list of values in USER_FIELDS order, followed by the groups"""
+
+        packed_user = [getattr(self, field) for field in USER_FIELDS]
+        packed_user[USER_FIELDS.index("badges")] = list(self.badges)
+        groups = [[getattr(group, field) for field in GROUP_FIELDS] for group in self.groups.values()]
+
+        return packed_user + [groups]
+
     @staticmethod
-    async def get_details(*args, user=None, author=None, username=None, roblox_id=None, everything=False, basic_details=False, roblox_user=None, group_ids=None, guild=None, return_embed=False):
+    def unpack(packed_user):
+        roblox_user = RobloxUser()
+
+        for field, value in zip(USER_FIELDS, packed_user):
+            setattr(roblox_user, field, value)
+
+        roblox_user.name = roblox_user.username
+
+        for packed_group in packed_user[len(USER_FIELDS)]:
+            group = Group(packed_group[0], {})
+
+            for field, value in zip(GROUP_FIELDS, packed_group):
+                setattr(group, field, value)
+
+            roblox_user.groups[group.group_id] = group
+
+        return roblox_user
+
+    @staticmethod
+    async def get_details(*args, user=None, author=None, username=None, roblox_id=None, everything=False, basic_details=False, roblox_user=None, group_ids=None, guild=None, return_embed=False, includes=None):
+        """loads the Roblox user's details. includes can limit the parts loaded to any of
+        avatar, groups, profile and overlay."""
+
         if everything:
             basic_details = True
 
@@ -2341,29 +2620,45 @@ class RobloxUser(Bloxlink.Module):
                 roblox_id, username = cache_find
 
             if roblox_id:
-                roblox_user_from_cache = await cache_get(f"roblox_users:{roblox_id}")
+                roblox_user_from_cache = await get_cached(f"roblox_users:{roblox_id}", RobloxUser)
 
         if roblox_user_from_cache and roblox_user_from_cache.verified:
+            # only scopes younger than their USER_SCOPE_TTLS entry are reused; the rest are fetched again
+            fresh_scopes = {scope for scope in USER_SCOPE_TTLS if not roblox_user_from_cache.is_stale(scope)}
+
             roblox_data["id"] = roblox_id or roblox_user_from_cache.id
             roblox_data["username"] = username or roblox_user_from_cache.username
             roblox_data["name"] = username or roblox_user_from_cache.name
-            roblox_data["display_name"] = roblox_user_from_cache.display_name
-            roblox_data["groups"] = roblox_user_from_cache.groups
-            roblox_data["group_ranks"] = roblox_user_from_cache.group_ranks
-            roblox_data["avatar"] = roblox_user_from_cache.avatar
-            roblox_data["premium"] = roblox_user_from_cache.premium
-            roblox_data["presence"] = roblox_user_from_cache.presence
-            roblox_data["badges"] = roblox_user_from_cache.badges
-            roblox_data["banned"] = roblox_user_from_cache.banned
-            roblox_data["join_date"] = roblox_user_from_cache.join_date
-            roblox_data["age_string"] = roblox_user_from_cache.age_string
-            roblox_data["full_join_string"] = roblox_user_from_cache.full_join_string
-            roblox_data["description"] = roblox_user_from_cache.description
-            roblox_data["age"] = roblox_user_from_cache.age
-            roblox_data["created"] = roblox_user_from_cache.created
             roblox_data["dev_forum"] = roblox_user_from_cache.dev_forum
-            roblox_data["overlay"] = roblox_user_from_cache.overlay
-            roblox_data["flags"] = roblox_user_from_cache.flags
+
+            if "groups" in fresh_scopes:
+                roblox_data["groups"] = roblox_user_from_cache.groups
+                roblox_data["group_ranks"] = roblox_user_from_cache.group_ranks
+                roblox_data["overlay"] = roblox_user_from_cache.overlay
+                roblox_data["flags"] = roblox_user_from_cache.flags
+
+            if "avatar" in fresh_scopes:
+                roblox_data["avatar"] = roblox_user_from_cache.avatar
+
+            if "badges" in fresh_scopes:
+                roblox_data["premium"] = roblox_user_from_cache.premium
+                roblox_data["badges"] = roblox_user_from_cache.badges
+
+            if "presence" in fresh_scopes:
+                roblox_data["presence"] = roblox_user_from_cache.presence
+
+            if "profile" in fresh_scopes:
+                roblox_data["display_name"] = roblox_user_from_cache.display_name
+                roblox_data["banned"] = roblox_user_from_cache.banned
+                roblox_data["join_date"] = roblox_user_from_cache.join_date
+                roblox_data["age_string"] = roblox_user_from_cache.age_string
+                roblox_data["full_join_string"] = roblox_user_from_cache.full_join_string
+                roblox_data["description"] = roblox_user_from_cache.description
+                roblox_data["age"] = roblox_user_from_cache.age
+                roblox_data["created"] = roblox_user_from_cache.created
+
+            if roblox_user and roblox_user is not roblox_user_from_cache:
+                roblox_user.synced_at = {scope: roblox_user_from_cache.synced_at[scope] for scope in fresh_scopes}
 
 
         if roblox_id and not username:
@@ -2407,6 +2702,7 @@ class RobloxUser(Bloxlink.Module):
 
                 if roblox_user:
                     roblox_user.avatar = avatar_url
+                    roblox_user.synced_at["avatar"] = time.time()
 
                 roblox_data["avatar"] = avatar_url
 
@@ -2435,6 +2731,7 @@ class RobloxUser(Bloxlink.Module):
                 if roblox_user:
                     roblox_user.badges = badges
                     roblox_user.premium = premium
+                    roblox_user.synced_at["badges"] = time.time()
 
             if return_embed:
                 if premium:
@@ -2460,6 +2757,7 @@ class RobloxUser(Bloxlink.Module):
 
                 if roblox_user:
                     roblox_user.groups = groups
+                    roblox_user.synced_at["groups"] = time.time()
 
                 roblox_data["groups"] = groups
 
@@ -2507,6 +2805,9 @@ class RobloxUser(Bloxlink.Module):
                 roblox_data["banned"] = banned
                 roblox_data["display_name"] = display_name
 
+                if roblox_user:
+                    roblox_user.synced_at["profile"] = time.time()
+
             if age is None:
                 today = datetime.today()
                 roblox_user_age = parser.parse(created).replace(tzinfo=None)
@@ -2577,19 +2878,13 @@ class RobloxUser(Bloxlink.Module):
             if roblox_data["dev_forum"] is not None:
                 dev_forum_profile = roblox_data["dev_forum"]
             else:
-                try:
-                    dev_forum_profile_, http_response = await fetch(f"https://devforum.roblox.com/u/by-external/{roblox_data['id']}.json", json=True, raise_on_failure=False, timeout=5, retry=0)
-
-                    if http_response.status == 200:
-                        dev_forum_profile = dev_forum_profile_.get("user")
-
-                        roblox_data["dev_forum"] = dev_forum_profile
+                dev_forum_profile = await Roblox.get_dev_forum_profile(roblox_data["id"])
 
-                        if roblox_user:
-                            roblox_user.dev_forum = roblox_data["dev_forum"]
+                if dev_forum_profile:
+                    roblox_data["dev_forum"] = dev_forum_profile
 
-                except (RobloxDown, RobloxAPIError):
-                    pass
+                    if roblox_user:
+                        roblox_user.dev_forum = roblox_data["dev_forum"]
 
             if embed and (everything or "dev_forum" in args or "devforum" in args):
                 if dev_forum_profile and dev_forum_profile.get("trust_level"):
@@ -2619,23 +2914,54 @@ class RobloxUser(Bloxlink.Module):
                 roblox_user.overlay = roblox_data["overlay"]
                 roblox_user.flags = roblox_data["flags"]
 
-        if basic_details or "avatar" in args:
-            await avatar()
-
-        if basic_details or "groups" in args:
+        async def groups_and_overlay():
             await groups()
+            await overlay()
+
+        def wants(part, requested):
+            return requested and (includes is None or part in includes)
+
+        parts = {}
 
-        if everything or "description" in args or "blurb" in args or "age" in args or "banned" in args:
-            await profile()
+        if wants("avatar", basic_details or "avatar" in args):
+            parts["avatar"] = avatar
+
+        if wants("overlay", everything or "overlay" in args):
+            parts["overlay"] = groups_and_overlay # the overlay is chosen from the user's groups
+        elif wants("groups", basic_details or "groups" in args):
+            parts["groups"] = groups
+
+        if wants("profile", everything or "description" in args or "blurb" in args or "age" in args or "banned" in args):
+            parts["profile"] = profile
 
         # if everything or "premium" in args or "badges" in args:
-        #     await membership_and_badges()
+        #     parts["badges"] = membership_and_badges
 
         # if everything or "dev_forum" in args or "devforum" in args:
-        #     await dev_forum()
+        #     parts["dev_forum"] = dev_forum
 
-        if everything or "overlay" in args:
-            await overlay()
+        # the parts are independent, so they're fetched at once. a part that times out
+        # or fails is left out instead of failing the whole profile.
+        results = await asyncio.gather(*[asyncio.wait_for(part(), ROBLOX_DETAILS_TIMEOUT) for part in parts.values()], return_exceptions=True)
+        missing_details = set()
+
+        for part_name, result in zip(parts, results):
+            if isinstance(result, (asyncio.TimeoutError, RobloxAPIError, RobloxDown)):
+                Bloxlink.log(f"Roblox user {roblox_data['id']}: could not load {part_name} ({type(result).__name__})")
+
+                if part_name in ("groups", "overlay"):
+                    # group binds are evaluated from the groups, so a user without them can't be updated
+                    if isinstance(result, asyncio.TimeoutError):
+                        raise RobloxDown from result
+
+                    raise result
+
+                missing_details.add(part_name)
+            elif isinstance(result, BaseException):
+                raise result
+
+        if roblox_user:
+            roblox_user.missing_details = missing_details
 
         if embed:
             if everything:
@@ -2659,7 +2985,7 @@ class RobloxUser(Bloxlink.Module):
 
         return (embed, files, card)
 
-    async def sync(self, *args, user=None, author=None, basic_details=True, group_ids=None, return_embed=False, guild=None, everything=False):
+    async def sync(self, *args, user=None, author=None, basic_details=True, group_ids=None, return_embed=False, guild=None, everything=False, includes=None):
         embed = discord.Embed()
 
         try:
@@ -2674,7 +3000,8 @@ class RobloxUser(Bloxlink.Module):
                 roblox_user = self,
                 user = user,
                 author = author,
-                guild = guild
+                guild = guild,
+                includes = includes
             )
 
         except RobloxAPIError:
@@ -2687,7 +3014,7 @@ class RobloxUser(Bloxlink.Module):
             else:
                 raise
         else:
-            self.complete = self.complete or everything
+            self.complete = (self.complete or everything) and not self.missing_details
             self.verified = True
             self.partial = not everything
             self.profile_link = self.profile_link or f"https://www.roblox.com/users/{self.id}/profile"
@@ -1,19 +1,29 @@
 from ...structures.Bloxlink import Bloxlink # pylint: disable=no-name-in-module, import-error
-from ...constants import RBX_STAFF, RBX_STAR, BLOXLINK_STAFF # pylint: disable=no-name-in-module, import-error
+from ...constants import RBX_STAFF, RBX_STAR, BLOXLINK_STAFF, USER_SCOPE_TTLS, SHARED_USER_CACHE_TTL # pylint: disable=no-name-in-module, import-error
 from ...exceptions import (RobloxNotFound, UserNotVerified) # pylint: disable=no-name-in-module, import-error
 from .groups import Group # pylint: disable=no-name-in-module, import-error
 import asyncio
 from datetime import datetime
 import dateutil.parser as parser
 import math
+import time
+import json
+import zlib
 
 
 API_URL = "https://api.roblox.com"
 ALL_USER_API_SCOPES = ["groups", "badges", "avatar"]
 
+# bump when the packed layouts below change; entries from other versions are ignored
+CACHE_FORMAT_VERSION = 1
+USER_FIELDS = ("name", "id", "complete", "avatar", "premium", "presence", "badges", "description",
+               "banned", "age_days", "created", "profile_link", "devforum", "display_name",
+               "group_ranks", "overlay", "flags", "join_date", "headshot", "year_created",
+               "short_age_string", "synced_at")
+
 
 fetch = Bloxlink.get_module("utils", attrs=["fetch"])
-cache_set, cache_get, get_user_value = Bloxlink.get_module("cache", attrs=["set", "get", "get_user_value"])
+cache_set, cache_get, cache_pop, get_user_value = Bloxlink.get_module("cache", attrs=["set", "get", "pop", "get_user_value"])
 get_linked_group_ids = Bloxlink.get_module("robloxnew.binds", attrs=["get_linked_group_ids"], name_override="binds")
 
 
@@ -24,7 +34,7 @@ class RobloxUser:
                  "avatar", "premium", "presence", "badges", "description",
                  "banned", "age_days", "created", "profile_link", "devforum", "display_name",
                  "group_ranks", "overlay", "flags", "join_date", "headshot", "year_created",
-                 "short_age_string")
+                 "short_age_string", "synced_at")
 
     def __init__(self, name=None, id=None):
         self.name = name
@@ -48,35 +58,76 @@ class RobloxUser:
         self.join_date = None
         self.headshot = None
         self.short_age_string = None
+        self.synced_at = {} # scope: when it was last fetched
 
         self.complete = False
 
-    async def sync(self, includes=None, *, cache=True, no_flag_check=False):
+    def is_stale(self, scope):
+        synced_at = self.synced_at.get(scope)
+
+        return synced_at is None or time.time() - synced_at > USER_SCOPE_TTLS[scope]
+
+    def pack(self):
+        """returns the user as a list of values in USER_FIELDS order, followed by the groups"""
+
+        groups = self.groups and [[group.id, group.name, group.rank_name, group.rank_value] for group in self.groups.values()]
+
+        return [getattr(self, field) for field in USER_FIELDS] + [groups]
+
+    @staticmethod
+    def unpack(packed_user):
+        roblox_user = RobloxUser()
+
+        for field, value in zip(USER_FIELDS, packed_user):
+            setattr(roblox_user, field, value)
+
+        groups = packed_user[len(USER_FIELDS)]
+
+        if groups is not None:
+            roblox_user.groups = {}
+
+            for group_id, group_name, rank_name, rank_value in groups:
+                roblox_user.groups[group_id] = Group({"id": group_id, "name": group_name}, {"name": rank_name, "rank": rank_value})
+
+        return roblox_user
+
+    async def sync(self, includes=None, *, cache=True, fresh=None, no_flag_check=False):
+        """fetches the scopes in includes which are stale. fresh lists scopes that must be
+        refetched regardless of their age; cache=False refetches everything requested.
+        returns whether the user was updated."""
+
+        complete = includes is True
+
         if includes is None:
             includes = []
         elif includes is True:
             includes = ALL_USER_API_SCOPES
-            self.complete = True
 
-        if cache:
-            # remove includes if we already have the value saved
-            if self.groups is not None and "groups" in includes:
-                includes.remove("groups")
+        fresh = set(fresh or ())
 
-            if self.presence is not None and "presence" in includes:
-                includes.remove("presence")
+        if not cache:
+            fresh.update(includes, ("profile",))
 
-            if self.badges is not None and "badges" in includes:
-                includes.remove("badges")
+        includes = [scope for scope in includes if scope in fresh or self.is_stale(scope)]
 
-            if self.avatar is not None and "avatar" in includes:
-                includes.remove("avatar")
+        # the profile is returned with every request, so it only needs its own request once stale
+        if not includes and "profile" not in fresh and not self.is_stale("profile"):
+            # every requested scope is already fresh
+            self.complete = self.complete or complete
 
-        includes = ",".join(includes)
+            return False
 
-        user_json_data, user_data_response = await fetch(f"https://bloxlink-rblx.bloxlink.workers.dev/roblox/users/info?id={self.id}&include={includes}", json=True)
+        user_json_data, user_data_response = await fetch(f"https://bloxlink-rblx.bloxlink.workers.dev/roblox/users/info?id={self.id}&include={','.join(includes)}", json=True)
 
         if user_data_response.status == 200:
+            self.complete = self.complete or complete
+
+            synced_at = time.time()
+            self.synced_at["profile"] = synced_at
+
+            for scope in includes:
+                self.synced_at[scope] = synced_at
+
             self.description = user_json_data.get("description", self.description)
             self.name = user_json_data.get("name", self.name)
             self.banned = user_json_data.get("isBanned", self.banned)
@@ -90,6 +141,9 @@ class RobloxUser:
 
             self.parse_groups(user_json_data.get("groups"))
 
+            if "groups" in includes or "badges" in includes:
+                self.flags = None
+
             if self.badges and self.groups and not no_flag_check:
                 await self.parse_flags()
 
@@ -103,6 +157,10 @@ class RobloxUser:
                 if avatar_response.status == 200:
                     self.avatar = avatar_url.get("data", [{}])[0].get("imageUrl")
 
+            return True
+
+        return False
+
     async def get_group_ranks(self, guild):
         group_ranks = {}
 
@@ -206,6 +264,19 @@ class DiscordProfile:
     def __eq__(self, other):
         return self.id == getattr(other, "id", None)
 
+    def pack(self):
+        return [self.id, self.primary_account and self.primary_account.pack(), self.accounts,
+                [[guild_id, roblox_user.pack()] for guild_id, roblox_user in self.guilds.items()]]
+
+    @staticmethod
+    def unpack(packed_profile):
+        user_id, primary_account, accounts, guilds = packed_profile
+
+        return DiscordProfile(user_id,
+                              primary_account=primary_account and RobloxUser.unpack(primary_account),
+                              accounts=accounts,
+                              guilds={guild_id: RobloxUser.unpack(roblox_user) for guild_id, roblox_user in guilds})
+
 
 
 
@@ -214,20 +285,53 @@ class Users(Bloxlink.Module):
     def __init__(self):
         pass
 
-    async def get_user(self, user=None, *, roblox_name=None, roblox_id=None, includes=None, guild=None, cache=True):
+    async def get_cached(self, key, cls):
+        """returns the RobloxUser or DiscordProfile saved under key, checking the local cache
+        first and then the cache shared by all clusters"""
+
+        cached_obj = await cache_get(key)
+
+        if cached_obj:
+            return cached_obj
+
+        packed_obj = await self.redis.get(key)
+
+        if packed_obj and packed_obj[0] == CACHE_FORMAT_VERSION:
+            cached_obj = cls.unpack(json.loads(zlib.decompress(packed_obj[1:])))
+            await cache_set(key, cached_obj)
+
+            return cached_obj
+
+        return None
+
+    async def set_cached(self, key, obj):
+        await cache_set(key, obj)
+
+        packed_obj = bytes((CACHE_FORMAT_VERSION,)) + zlib.compress(json.dumps(obj.pack(), separators=(",", ":")).encode("utf-8"))
+        await self.redis.set(key, packed_obj, ex=SHARED_USER_CACHE_TTL)
+
+    async def pop_cached(self, key):
+        await cache_pop(key)
+        await self.redis.delete(key)
+
+    async def clear_discord_profile(self, user_id):
+        await self.pop_cached(f"discord_profiles_v2:{user_id}")
+
+    async def get_user(self, user=None, *, roblox_name=None, roblox_id=None, includes=None, guild=None, cache=True, fresh=None):
         roblox_user = None
         roblox_accounts = []
         discord_profile = None
 
         if user:
             if cache:
-                discord_profile = await cache_get(f"discord_profiles_v2:{user.id}")
+                discord_profile = await self.get_cached(f"discord_profiles_v2:{user.id}", DiscordProfile)
 
                 if discord_profile:
                     roblox_user = discord_profile.guilds.get(guild.id) if guild else discord_profile.primary_account
 
                     if roblox_user:
-                        await roblox_user.sync(includes, cache=cache)
+                        if await roblox_user.sync(includes, cache=cache, fresh=fresh):
+                            await self.set_cached(f"discord_profiles_v2:{user.id}", discord_profile)
 
                         return roblox_user, discord_profile.accounts
 
@@ -240,7 +344,7 @@ class Users(Bloxlink.Module):
                     discord_profile.primary_account = RobloxUser(id=primary_account)
 
                     if roblox_user != primary_account:
-                        await discord_profile.primary_account.sync(includes, cache=cache)
+                        await discord_profile.primary_account.sync(includes, cache=cache, fresh=fresh)
 
                 discord_profile.accounts = roblox_accounts
 
@@ -252,22 +356,23 @@ class Users(Bloxlink.Module):
                 roblox_id = (await self.get_roblox_id(roblox_name))[0]
 
             if cache:
-                roblox_user = await cache_get(f"roblox_users_v2:{id}")
+                roblox_user = await self.get_cached(f"roblox_users_v2:{roblox_id}", RobloxUser)
 
         roblox_user = roblox_user or RobloxUser(name=roblox_name, id=roblox_id)
 
-        await roblox_user.sync(includes, cache=cache)
+        await roblox_user.sync(includes, cache=cache, fresh=fresh)
 
-        if cache:
+        # a user whose sync never succeeded isn't worth sharing
+        if cache and roblox_user.synced_at:
             if roblox_user:
-                await cache_set(f"roblox_users_v2:{roblox_id}", roblox_user)
+                await self.set_cached(f"roblox_users_v2:{roblox_id}", roblox_user)
 
             if discord_profile:
 
                 if guild:
                     discord_profile.guilds[guild.id] = roblox_user
 
-                await cache_set(f"discord_profiles_v2:{user.id}", discord_profile)
+                await self.set_cached(f"discord_profiles_v2:{user.id}", discord_profile)
 
         return roblox_user, roblox_accounts
 
@@ -5,6 +5,9 @@ import asyncio
 
 
 cache_clear = Bloxlink.get_module("cache", attrs=["clear"])
+clear_prefixes = Bloxlink.get_module("commands", attrs=["clear_prefixes"])
+clear_restrictions = Bloxlink.get_module("blacklist", attrs=["clear_restrictions"])
+clear_magic_roles = Bloxlink.get_module("extras", attrs=["clear_magic_roles"])
 
 
 @Bloxlink.module
@@ -19,5 +22,8 @@ class TimedActions(Bloxlink.Module):
     async def timed_actions(self):
         while True:
             await cache_clear()
+            clear_prefixes()
+            clear_restrictions()
+            clear_magic_roles()
 
             await asyncio.sleep(CACHE_CLEAR * 60)
@@ -14,6 +14,7 @@ import json as json_
 
 
 get_guild_value, set_guild_value = Bloxlink.get_module("cache", attrs=["get_guild_value", "set_guild_value"])
+schedule = Bloxlink.get_module("ratelimits", attrs=["schedule"])
 
 @Bloxlink.module
 class Utils(Bloxlink.Module):
@@ -27,6 +28,40 @@ class Utils(Bloxlink.Module):
     def get_files(directory):
         return [name for name in listdir(directory) if name[:1] != "." and name[:2] != "__" and name != "_DS_Store"]
 
+    @staticmethod
+    async def fetch_role_members(guild, role, limit=None):
+        """yields up to limit members of the role without chunking the guild. if the guild
+        isn't chunked, the member list is paged through the API (a request per 1000 members)
+        until limit members of the role are found, and only those are kept in memory."""
+
+        if guild.chunked:
+            for member in role.members[:limit]:
+                yield member
+
+            return
+
+        found = 0
+
+        async for member in guild.fetch_members(limit=None):
+            if member.get_role(role.id):
+                yield member
+
+                found += 1
+
+                if found == limit:
+                    # stops paging through the rest of the guild
+                    return
+
+    @staticmethod
+    def evict_members(guild, member_ids):
+        """removes members from the guild cache that were only cached for the duration of a scan"""
+
+        for member_id in member_ids:
+            member = guild.get_member(member_id)
+
+            if member and member.id != guild.me.id:
+                guild._remove_member(member) # pylint: disable=protected-access
+
     @staticmethod
     def coro_async(corofn, *args):
         # https://stackoverflow.com/questions/46074841/why-coroutines-cannot-be-used-with-run-in-executor
@@ -99,7 +134,7 @@ class Utils(Bloxlink.Module):
             embed.colour = color
 
             try:
-                await webhook.send(embed=embed)
+                await schedule("webhook", int(webhook.id), webhook.send, embed=embed, guild_id=guild.id)
             except (Forbidden, NotFound):
                 pass
 
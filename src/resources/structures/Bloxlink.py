@@ -2,11 +2,13 @@ from importlib import import_module
 from os import environ as env
 from discord import AutoShardedClient, AllowedMentions, Intents, Game
 from config import WEBHOOKS # pylint: disable=E0611
-from ..constants import SHARD_RANGE, CLUSTER_ID, SHARD_COUNT, RELEASE, SELF_HOST, PLAYING_STATUS # pylint: disable=import-error, no-name-in-module
+from ..constants import SHARD_RANGE, CLUSTER_ID, SHARD_COUNT, RELEASE, SELF_HOST, PLAYING_STATUS, DB_PROFILER # pylint: disable=import-error, no-name-in-module
 from ..secrets import (REDIS_CONNECTION_STRING, MONGO_CONNECTION_STRING, MONGO_CA_FILE, DISCORD_PROXY) # pylint: disable=import-error, no-name-in-module)
 from . import Permissions # pylint: disable=import-error, no-name-in-module
+from .DatabaseProfiler import DatabaseProfiler, ProfiledDatabase # pylint: disable=import-error, no-name-in-module
 from os.path import exists
 import functools
+import time
 import traceback
 import datetime
 import logging
@@ -29,6 +31,10 @@ class BloxlinkStructure(AutoShardedClient):
     db_host_validated = False
     conn = None
     loaded_modules = {}
+    resolved_modules = {}
+    setup_tasks = {}
+    startup_timings = {}
+    db_profiler = DatabaseProfiler() if DB_PROFILER else None
 
     def __init__(self, *args, **kwargs): # pylint: disable=W0235
         super().__init__(*args, **kwargs)
@@ -53,6 +59,9 @@ class BloxlinkStructure(AutoShardedClient):
         db = motor.motor_asyncio.AsyncIOMotorClient(MONGO_CONNECTION_STRING, tlsCAFile="src/cert.crt" if MONGO_CA_FILE else None)["bloxlink"]
         db.get_io_loop = asyncio.get_running_loop
 
+        if BloxlinkStructure.db_profiler:
+            db = ProfiledDatabase(db, BloxlinkStructure.db_profiler)
+
         return db
 
     @staticmethod
@@ -137,12 +146,12 @@ class BloxlinkStructure(AutoShardedClient):
         module_dir = module.__module__.lower()
 
         if hasattr(new_module, "__setup__"):
-            asyncio.run_coroutine_threadsafe(new_module.__setup__(), loop)
+            BloxlinkStructure.setup_tasks[module_name] = asyncio.run_coroutine_threadsafe(Bloxlink.run_setup(module_name, new_module), loop)
 
         Bloxlink.log(f"Loaded {module_name}")
 
         if hasattr(new_module, "__loaded__"):
-            asyncio.run_coroutine_threadsafe(new_module.__loaded__(), loop)
+            asyncio.run_coroutine_threadsafe(Bloxlink.run_loaded(module_name, new_module), loop)
 
         if BloxlinkStructure.loaded_modules.get(module_dir):
             BloxlinkStructure.loaded_modules[module_dir][module_name] = new_module
@@ -151,6 +160,27 @@ class BloxlinkStructure(AutoShardedClient):
 
         return new_module
 
+    @staticmethod
+    async def run_setup(module_name, new_module):
+        started = time.perf_counter()
+
+        await new_module.__setup__()
+
+        BloxlinkStructure.startup_timings[f"{module_name}.__setup__"] = time.perf_counter() - started
+
+    @staticmethod
+    async def run_loaded(module_name, new_module):
+        """runs __loaded__ once the module's own __setup__ and the __setup__ of every module
+        in its `dependencies` have finished. setups that never return (listeners) shouldn't be depended on."""
+
+        dependencies = [BloxlinkStructure.setup_tasks[dependency] for dependency in (module_name, *getattr(new_module, "dependencies", ()))
+                        if dependency in BloxlinkStructure.setup_tasks]
+
+        if dependencies:
+            await asyncio.gather(*[asyncio.wrap_future(dependency) for dependency in dependencies], return_exceptions=True)
+
+        await new_module.__loaded__()
+
     @staticmethod
     def loader(module):
         def load(*args, **kwargs):
@@ -170,13 +200,17 @@ class BloxlinkStructure(AutoShardedClient):
         save_as  = f"{name_override_pattern.lower()}{(dir_name).lower()}"
         modules = BloxlinkStructure.loaded_modules.get(save_as)
         name_obj = (name_override or dir_name).lower()
+        import_name = f"{path}.{dir_name}".replace("src/", "").replace("/",".").replace(".py","")
 
         class_obj = None
         module = None
 
-        if not modules:
-            import_name = f"{path}.{dir_name}".replace("src/", "").replace("/",".").replace(".py","")
+        resolved = BloxlinkStructure.resolved_modules.get((import_name, name_obj))
+
+        if resolved:
+            module, class_obj = resolved
 
+        elif not modules:
             try:
                 module = import_module(import_name)
             except (ModuleNotFoundError, ImportError) as e:
@@ -206,6 +240,10 @@ class BloxlinkStructure(AutoShardedClient):
 
                     break
 
+        if class_obj is not None and not resolved:
+            # the module has finished importing, so we can skip the dir() scan next time
+            BloxlinkStructure.resolved_modules[(import_name, name_obj)] = (module, class_obj)
+
 
         if class_obj is not None:
             if attrs:
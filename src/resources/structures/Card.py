@@ -1,7 +1,12 @@
 from ..structures import Bloxlink, InteractionPaginator # pylint: disable=import-error, no-name-in-module
-from ..constants import BLOXLINK_STAFF
+from ..constants import BLOXLINK_STAFF, CARD_RENDER_CACHE_SIZE, CARD_RENDER_CACHE_TTL, CARD_BACKGROUNDS_TTL
 from ..secrets import IMAGE_SERVER_URL, IMAGE_SERVER_AUTH
+from collections import OrderedDict
 from io import BytesIO
+from time import time
+import asyncio
+import hashlib
+import json
 import enum
 import discord
 
@@ -38,6 +43,13 @@ class MoreInformationSelect(discord.ui.Select):
         await interaction.response.send_message(value, ephemeral=True)
 
 
+# render hash -> png bytes, shared by every card on this cluster
+rendered_cards = OrderedDict()
+
+# card type -> (expiry, backgrounds). the catalog rarely changes, so it's kept for a long time
+background_catalogs = {}
+
+
 class CardSide(enum.Enum):
     FRONT = 1
     BACK  = 2
@@ -53,6 +65,7 @@ class Card(Bloxlink.Module):
         self.extra_data = extra_data or {}
         self.view = discord.ui.View(timeout=1000.0)
         self.paginator = None
+        self.unlocks = None
         self.user_backgrounds = {}
         self.user_tokens = 0
         self.merch_unlocked = False
@@ -107,10 +120,42 @@ class Card(Bloxlink.Module):
         if self.guild and not self.group_ranks:
             self.group_ranks = await self.roblox_user.get_group_ranks(self.guild)
 
+    async def render_card(self, path, body):
+        """renders the card through the image server. renders are cached by a hash of their inputs,
+        in memory and then in redis, so the same card is only ever rendered once."""
+
+        render_hash = hashlib.sha256(f"{path}:{json.dumps(body, sort_keys=True, default=str)}".encode("utf-8")).hexdigest()
+        redis_key = f"card_render:{render_hash}"
+
+        card_bytes = rendered_cards.get(render_hash)
+
+        if card_bytes:
+            rendered_cards.move_to_end(render_hash)
+            return card_bytes
+
+        if self.redis:
+            card_bytes = await self.redis.get(redis_key)
+
+        if not card_bytes:
+            card_bytes, http_response = await fetch(f"{IMAGE_SERVER_URL}{path}", bytes=True, body=body, headers={"Authorization": IMAGE_SERVER_AUTH})
+
+            if http_response.status != 200:
+                return card_bytes
+
+            if self.redis:
+                await self.redis.set(redis_key, card_bytes, ex=CARD_RENDER_CACHE_TTL)
+
+        rendered_cards[render_hash] = card_bytes
+
+        if len(rendered_cards) > CARD_RENDER_CACHE_SIZE:
+            rendered_cards.popitem(last=False)
+
+        return card_bytes
+
     async def request_front_card(self):
         if not self.front_card_bytes:
             if self.type == "getinfo":
-                profile_image_bytes, http_response = await fetch(f"{IMAGE_SERVER_URL}/getinfo/front", bytes=True, body={
+                profile_image_bytes = await self.render_card("/getinfo/front", {
                     "background": await Card.get_equipped_background(self.roblox_user.id) or "null",
                     "username": self.roblox_user.name,
                     "display_name": self.roblox_user.display_name,
@@ -120,9 +165,9 @@ class Card(Bloxlink.Module):
                     "id": self.roblox_user.id,
                     "age": self.roblox_user.short_age_string,
                     "banned": self.roblox_user.banned
-                }, headers={"Authorization": IMAGE_SERVER_AUTH})
+                })
             elif self.type == "verify":
-                profile_image_bytes, http_response = await fetch(f"{IMAGE_SERVER_URL}/verify/front", bytes=True, body={
+                profile_image_bytes = await self.render_card("/verify/front", {
                     "background": await Card.get_equipped_background(self.roblox_user.id) or "null",
                     "username": self.roblox_user.name,
                     "display_name": self.roblox_user.display_name,
@@ -131,7 +176,7 @@ class Card(Bloxlink.Module):
                     "roles": {"added": self.extra_data.get("added"), "removed": self.extra_data.get("removed")},
                     "warnings": self.extra_data.get("warnings"),
                     "errors": self.extra_data.get("errors")
-                }, headers={"Authorization": IMAGE_SERVER_AUTH})
+                })
 
             self.front_card_bytes = profile_image_bytes
 
@@ -140,28 +185,41 @@ class Card(Bloxlink.Module):
     async def request_back_card(self):
         if not self.back_card_bytes:
             if self.type == "getinfo":
-                profile_image_bytes, http_response = await fetch(f"{IMAGE_SERVER_URL}/getinfo/back", bytes=True, body={
+                profile_image_bytes = await self.render_card("/getinfo/back", {
                     "background": await Card.get_equipped_background(self.roblox_user.id) or "null",
                     "username": self.roblox_user.name,
                     "display_name": self.roblox_user.display_name,
                     "group_ranks": self.group_ranks or {},
                     "banned": self.roblox_user.banned
-                }, headers={"Authorization": IMAGE_SERVER_AUTH})
+                })
 
             self.back_card_bytes = profile_image_bytes
 
         self.back_card_file = discord.File(BytesIO(self.back_card_bytes), filename="profile.png")
 
     async def get_backgrounds(self):
+        catalog = background_catalogs.get(self.type)
+
+        if catalog and catalog[0] > time():
+            return catalog[1]
+
         backgrounds, http_response = await fetch(f"{IMAGE_SERVER_URL}/backgrounds/", params={
             "type": self.type
         }, headers={"Authorization": IMAGE_SERVER_AUTH})
 
         if http_response.status == 200:
+            background_catalogs[self.type] = (time() + CARD_BACKGROUNDS_TTL, backgrounds)
+
             return backgrounds
 
         return []
 
+    @staticmethod
+    def clear_backgrounds():
+        """drops the cached background catalog, e.g. after backgrounds were added"""
+
+        background_catalogs.clear()
+
     async def buy_background(self, background_name):
         unlocks = await self.get_user_unlocks()
 
@@ -171,6 +229,8 @@ class Card(Bloxlink.Module):
         unlocks["tokens"]["backgrounds"] -= 1
         unlocks["backgrounds"][background_name] = True
 
+        self.user_tokens = unlocks["tokens"]["backgrounds"]
+
         self.paginator.unlocked = True
         self.paginator.custom_button.label = "Equip Background"
         self.paginator.custom_button.style = discord.ButtonStyle.success
@@ -261,6 +321,11 @@ class Card(Bloxlink.Module):
                 self.paginator.custom_button.style = discord.ButtonStyle.secondary
 
     async def get_user_unlocks(self):
+        """gets the user's unlocks. they're loaded once per card and kept up to date by buy_background."""
+
+        if self.unlocks is not None:
+            return self.unlocks
+
         unlocks = await get_user_value(self.user, "unlocks") or {}
 
         unlocks["backgrounds"] = unlocks.get("backgrounds") or {}
@@ -270,6 +335,7 @@ class Card(Bloxlink.Module):
         self.user_tokens = unlocks["tokens"]["backgrounds"]
         self.user_backgrounds = unlocks["backgrounds"]
         self.merch_unlocked = unlocks.get("merch")
+        self.unlocks = unlocks
 
         return unlocks
 
@@ -305,8 +371,8 @@ class Card(Bloxlink.Module):
         if self.from_interaction:
             self.response.renew(interaction)
 
-        await self.get_user_unlocks()
-        self.equipped_background = await Card.get_equipped_background(self.roblox_user.id)
+        if self.unlocks is None:
+            _, self.equipped_background = await asyncio.gather(self.get_user_unlocks(), Card.get_equipped_background(self.roblox_user.id))
 
         all_backgrounds = []
         limited_time_backgrounds = []
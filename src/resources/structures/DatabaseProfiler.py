@@ -0,0 +1,195 @@
+from ..constants import DB_PROFILER_SAMPLES # pylint: disable=import-error, no-name-in-module
+import random
+import time
+
+
+PROFILED_METHODS = ("find_one", "insert_one", "insert_many", "update_one", "update_many", "replace_one",
+                    "delete_one", "delete_many", "count_documents", "find_one_and_update", "bulk_write")
+
+
+class QueryShape:
+    __slots__ = ("collection", "op", "filter_keys", "projection_keys", "count", "total_time", "samples", "documents")
+
+    def __init__(self, collection, op, filter_keys, projection_keys):
+        self.collection = collection
+        self.op = op
+        self.filter_keys = filter_keys
+        self.projection_keys = projection_keys
+
+        self.count = 0
+        self.total_time = 0
+        self.samples = [] # latencies, reservoir sampled once full
+        self.documents = 0
+
+    def record(self, latency, documents):
+        self.count += 1
+        self.total_time += latency
+        self.documents += documents
+
+        if len(self.samples) < DB_PROFILER_SAMPLES:
+            self.samples.append(latency)
+        else:
+            i = random.randrange(self.count)
+
+            if i < DB_PROFILER_SAMPLES:
+                self.samples[i] = latency
+
+    def percentile(self, p):
+        if not self.samples:
+            return 0
+
+        samples = sorted(self.samples)
+
+        return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+    def to_dict(self):
+        return {
+            "collection": self.collection,
+            "op": self.op,
+            "filter": list(self.filter_keys),
+            "projection": list(self.projection_keys),
+            "count": self.count,
+            "total_ms": round(self.total_time * 1000, 2),
+            "p50_ms": round(self.percentile(0.5) * 1000, 2),
+            "p95_ms": round(self.percentile(0.95) * 1000, 2),
+            "p99_ms": round(self.percentile(0.99) * 1000, 2),
+            "avg_documents": round(self.documents / self.count, 2) if self.count else 0
+        }
+
+
+class DatabaseProfiler:
+    """records the shape of every query sent through a ProfiledDatabase. works with any
+    motor-like database, so it can wrap a local mongod or a mock."""
+
+    def __init__(self):
+        self.shapes = {}
+
+    def record(self, collection, op, query_filter, projection, latency, documents):
+        filter_keys = tuple(sorted(query_filter or ()))
+        projection_keys = tuple(sorted(projection or ())) if isinstance(projection, dict) else tuple(projection or ())
+        shape_key = (collection, op, filter_keys, projection_keys)
+        shape = self.shapes.get(shape_key)
+
+        if not shape:
+            shape = self.shapes[shape_key] = QueryShape(collection, op, filter_keys, projection_keys)
+
+        shape.record(latency, documents)
+
+    def top_shapes(self, limit=10, sort_by="total_time"):
+        return [shape.to_dict() for shape in sorted(self.shapes.values(), key=lambda s: getattr(s, sort_by), reverse=True)[:limit]]
+
+    async def suggest_indexes(self, db):
+        """returns the shapes whose filter isn't covered by the prefix of an existing index,
+        slowest first"""
+
+        indexes = {}
+        suggestions = []
+
+        for shape in sorted(self.shapes.values(), key=lambda s: s.total_time, reverse=True):
+            if not shape.filter_keys or shape.filter_keys == ("_id",):
+                continue
+
+            if shape.collection not in indexes:
+                index_information = await db[shape.collection].index_information()
+                indexes[shape.collection] = [[key for key, _ in index["key"]] for index in index_information.values()]
+
+            filter_keys = set(shape.filter_keys)
+
+            if not any(set(index_keys[:len(filter_keys)]) == filter_keys or "_id" in filter_keys and index_keys == ["_id"]
+                       for index_keys in indexes[shape.collection]):
+                suggestions.append({**shape.to_dict(), "suggested_index": list(shape.filter_keys)})
+
+        return suggestions
+
+    def reset(self):
+        self.shapes = {}
+
+
+class ProfiledCursor:
+    def __init__(self, cursor, profiler, collection, query_filter, projection):
+        self.cursor = cursor
+        self.profiler = profiler
+        self.collection = collection
+        self.query_filter = query_filter
+        self.projection = projection
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+    async def __aiter__(self):
+        started = time.perf_counter()
+        documents = 0
+
+        try:
+            async for document in self.cursor:
+                documents += 1
+                yield document
+        finally:
+            self.profiler.record(self.collection, "find", self.query_filter, self.projection, time.perf_counter() - started, documents)
+
+    async def to_list(self, length=None):
+        started = time.perf_counter()
+        documents = await self.cursor.to_list(length)
+
+        self.profiler.record(self.collection, "find", self.query_filter, self.projection, time.perf_counter() - started, len(documents))
+
+        return documents
+
+
+class ProfiledCollection:
+    def __init__(self, collection, profiler):
+        self.collection = collection
+        self.profiler = profiler
+
+    def __getattr__(self, name):
+        attr = getattr(self.collection, name)
+
+        if name not in PROFILED_METHODS:
+            return attr
+
+        async def profiled(*args, **kwargs):
+            query_filter = args[0] if args and isinstance(args[0], dict) else kwargs.get("filter")
+            projection = args[1] if name == "find_one" and len(args) > 1 else kwargs.get("projection")
+            started = time.perf_counter()
+
+            result = await attr(*args, **kwargs)
+
+            if name == "find_one":
+                documents = int(result is not None)
+            elif name == "bulk_write":
+                documents = len(args[0]) if args else 0
+            else:
+                documents = getattr(result, "matched_count", None) or getattr(result, "deleted_count", None) or 0
+
+            self.profiler.record(self.collection.name, name, query_filter, projection, time.perf_counter() - started, documents)
+
+            return result
+
+        return profiled
+
+    def find(self, *args, **kwargs):
+        query_filter = args[0] if args else kwargs.get("filter")
+        projection = args[1] if len(args) > 1 else kwargs.get("projection")
+
+        return ProfiledCursor(self.collection.find(*args, **kwargs), self.profiler, self.collection.name, query_filter, projection)
+
+
+class ProfiledDatabase:
+    def __init__(self, db, profiler):
+        self.db = db
+        self.profiler = profiler
+        self.collections = {}
+
+    def __getitem__(self, name):
+        collection = self.collections.get(name)
+
+        if not collection:
+            collection = self.collections[name] = ProfiledCollection(self.db[name], self.profiler)
+
+        return collection
+
+    def __getattr__(self, name):
+        if name.startswith("_") or hasattr(type(self.db), name):
+            return getattr(self.db, name)
+
+        return self[name]
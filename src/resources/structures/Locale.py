@@ -1,34 +1,52 @@
 import json
-from jsonpath_ng import parse
 from ..structures.Bloxlink import Bloxlink # pylint: disable=import-error, no-name-in-module
 
 
 get_files = Bloxlink.get_module("utils", attrs="get_files")
 
+DEFAULT_LOCALE = "en"
+
 locales = {}
 
+
+def flatten(node, path="", flat=None):
+	"""flattens the locale into {"dotted.path": value} for every key, including non-string values"""
+
+	flat = {} if flat is None else flat
+
+	if isinstance(node, dict):
+		for key, value in node.items():
+			key_path = f"{path}.{key}" if path else key
+			flat[key_path] = value
+
+			flatten(value, key_path, flat)
+
+	return flat
+
+
 for file_name in get_files("src/locales"):
 	with open(f"src/locales/{file_name}") as f:
 		file_contents = f.read()
 		file_json = json.loads(file_contents)
-		locales[file_name.replace(".json", "")] = file_json
+		locales[file_name.replace(".json", "")] = flatten(file_json)
+
+# resolve the fallback chain ahead of time: any missing string falls back to the default locale
+for lang, flat_locale in locales.items():
+	if lang != DEFAULT_LOCALE:
+		locales[lang] = {**locales.get(DEFAULT_LOCALE, {}), **flat_locale}
 
 
 
 class Locale:
-	def __init__(self, lang="en"):
+	def __init__(self, lang=DEFAULT_LOCALE):
 		self.lang = lang
+		self.strings = locales.get(lang) or locales.get(DEFAULT_LOCALE, {})
 
 	def __call__(self, locale_path, *args, **kwargs):
-		jsonpath_expr = parse(locale_path)
-
-		try:
-			match = jsonpath_expr.find(locales.get(self.lang, "en"))[0].value
-		except IndexError:
-			try:
-				match = jsonpath_expr.find(locales.get("en"))[0].value
-			except IndexError:
-				return locale_path
+		match = self.strings.get(locale_path)
+
+		if match is None:
+			return locale_path
 
 		if isinstance(match, str):
 			return match.format(*args, **kwargs)
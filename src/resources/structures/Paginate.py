@@ -1,6 +1,7 @@
 import discord
 from ..exceptions import CancelCommand, Error # pylint: disable=import-error, no-name-in-module
 from ..structures import Bloxlink # pylint: disable=import-error, no-name-in-module
+from ..constants import PAGINATOR_PAGE_WINDOW # pylint: disable=import-error, no-name-in-module
 from asyncio import TimeoutError
 import math
 
@@ -28,7 +29,92 @@ class InteractionPaginatorSelect(discord.ui.Select):
         await self.paginator.start_position()
 
 
+class PaginatorItems:
+    """a category backed by a list"""
+
+    def __init__(self, items, page_size):
+        self.items = items
+        self.page_size = page_size
+        self.total = len(items)
+
+    async def get_page(self, page):
+        return self.items[page*self.page_size:(page+1)*self.page_size]
+
+    async def has_page(self, page):
+        return page * self.page_size < self.total
+
+
+class LazyPaginatorItems:
+    """a category backed by a function returning an async generator. items are only pulled
+    when their page is needed, and only pages near the current one are kept, along with
+    the last page once it's been reached. going back past the kept pages restarts the generator."""
+
+    def __init__(self, generator_fn, page_size, window=PAGINATOR_PAGE_WINDOW):
+        self.generator_fn = generator_fn
+        self.page_size = page_size
+        self.window = window
+        self.pages = {}
+        self.iterator = None
+        self.next_page = 0
+        self.total = None
+        self.last_page = None # (page, items), known once the generator is exhausted
+
+    async def pull_page(self):
+        items = []
+
+        while len(items) < self.page_size:
+            try:
+                items.append(await self.iterator.__anext__())
+            except StopAsyncIteration:
+                self.total = self.next_page * self.page_size + len(items)
+                self.iterator = None
+
+                break
+
+        return items
+
+    async def get_page(self, page):
+        if page in self.pages:
+            return self.pages[page]
+
+        if self.last_page and self.last_page[0] == page:
+            return self.last_page[1]
+
+        if self.total is not None and page * self.page_size >= self.total:
+            return []
+
+        if self.iterator is None or page < self.next_page:
+            self.iterator = self.generator_fn().__aiter__()
+            self.next_page = 0
+
+        previous_items = self.pages.get(self.next_page - 1, [])
+
+        while self.next_page <= page and self.iterator:
+            items = await self.pull_page()
+
+            if abs(self.next_page - page) <= self.window:
+                self.pages[self.next_page] = items
+
+            if self.iterator is None:
+                # an empty final pull means the previous page was the last one
+                self.last_page = (self.next_page, items) if items or not self.next_page else (self.next_page - 1, previous_items)
+
+            previous_items = items
+            self.next_page += 1
+
+        for cached_page in [p for p in self.pages if abs(p - page) > self.window]:
+            self.pages.pop(cached_page)
+
+        return self.pages.get(page, [])
+
+    async def has_page(self, page):
+        return page == 0 or bool(await self.get_page(page))
+
+
 class InteractionPaginator(discord.ui.View):
+    """items is {category: list of items}. a category can also be a function returning an
+    async generator, in which case only the pages being shown are pulled from it."""
+
     def __init__(self, items, response, embed=None, max_items=5, initialize_components=True, use_fields=True, use_embed_pictures=False, default_category=None, description=None, ephemeral=False, footer=""):
         super().__init__()
 
@@ -36,7 +122,8 @@ class InteractionPaginator(discord.ui.View):
         self.response = response
         self.embed = embed or discord.Embed()
         self.max_items = max_items
-        self.items = items
+        self.items = {category: LazyPaginatorItems(category_items, max_items) if callable(category_items) else PaginatorItems(category_items or [], max_items)
+                      for category, category_items in items.items()}
         self.use_fields = use_fields
         self.use_embed_pictures = use_embed_pictures
         self.description = description
@@ -53,11 +140,21 @@ class InteractionPaginator(discord.ui.View):
 
         self.current_category = default_category or self.categories[0]
         self.current_items = []
+        self.has_next_page = False
 
     async def page_change(self):
         if self.on_page_change:
             await self.on_page_change() # pylint: disable=not-callable
 
+    async def load_page(self):
+        """loads the items ending at self.i, and checks if there's a page after them"""
+
+        all_items = self.items[self.current_category]
+        page = self.i // self.max_items - 1
+
+        self.current_items = await all_items.get_page(page)
+        self.has_next_page = await all_items.has_page(page + 1)
+
     async def fast_rewind_press(self, interaction):
         await interaction.response.defer(thinking=False)
 
@@ -68,9 +165,10 @@ class InteractionPaginator(discord.ui.View):
 
         all_items = self.items[self.current_category]
 
-        self.i = math.ceil((len(all_items) / self.max_items)) * self.max_items
+        # only enabled once the total is known, see check_buttons
+        self.i = (math.ceil(all_items.total / self.max_items) or 1) * self.max_items
 
-        self.current_items = all_items[self.i-self.max_items:self.i]
+        await self.load_page()
 
         self.populate_embed()
 
@@ -88,8 +186,7 @@ class InteractionPaginator(discord.ui.View):
 
         self.i = self.i-self.max_items
 
-        all_items = self.items[self.current_category]
-        self.current_items = all_items[self.i-self.max_items:self.i]
+        await self.load_page()
 
         self.populate_embed()
 
@@ -99,7 +196,7 @@ class InteractionPaginator(discord.ui.View):
             self.forward_button.disabled = False
 
         if self.fast_forward_button:
-            self.fast_forward_button.disabled = False
+            self.fast_forward_button.disabled = self.items[self.current_category].total is None
 
         await self.page_change()
 
@@ -108,11 +205,10 @@ class InteractionPaginator(discord.ui.View):
     async def forward_press(self, interaction):
         await interaction.response.defer(thinking=False)
 
-        all_items = self.items[self.current_category]
-        self.current_items = all_items[self.i:self.i+self.max_items]
-
         self.i = self.i+self.max_items
 
+        await self.load_page()
+
         self.populate_embed()
 
         self.check_buttons()
@@ -159,24 +255,30 @@ class InteractionPaginator(discord.ui.View):
         else:
             self.embed.description = self.embed.description + "\n".join(self.current_items)
 
-        self.embed.set_footer(text=f"{self.footer} Page {self.i // self.max_items} of {((math.ceil(len(all_items) / self.max_items)) or 1)}")
+        if all_items.total is not None:
+            self.embed.set_footer(text=f"{self.footer} Page {self.i // self.max_items} of {((math.ceil(all_items.total / self.max_items)) or 1)}")
+        else:
+            self.embed.set_footer(text=f"{self.footer} Page {self.i // self.max_items}")
 
     def check_buttons(self):
-        all_items = self.items[self.current_category]
-
         if self.forward_button:
             self.forward_button.disabled = False
 
         if self.back_button:
             self.back_button.disabled = False
 
-        if self.i >= len(all_items):
+        if not self.has_next_page:
             if self.forward_button:
                 self.forward_button.disabled = True
 
             if self.fast_forward_button:
                 self.fast_forward_button.disabled = True
 
+        if self.fast_forward_button and self.items[self.current_category].total is None:
+            # a lazy category's length is only known once it's been read to the end, so
+            # jumping to the last page would pull every page before it
+            self.fast_forward_button.disabled = True
+
         if self.i == self.max_items:
             if self.back_button:
                 self.back_button.disabled = True
@@ -218,12 +320,9 @@ class InteractionPaginator(discord.ui.View):
             self.add_item(self.fast_forward_button)
 
     async def start_position(self):
-        self.i = 0
+        self.i = self.max_items
 
-        all_items = self.items[self.current_category]
-        self.current_items = all_items[self.i:self.i+self.max_items]
-
-        self.i = self.i+self.max_items
+        await self.load_page()
 
         self.populate_embed()
 
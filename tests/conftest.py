@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the bot imports its packages relative to src, the same as when running src/bot.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,43 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from resources.exceptions import Blacklisted # pylint: disable=import-error, no-name-in-module
+from resources.modules import blacklist as blacklist_module # pylint: disable=import-error, no-name-in-module
+from resources.modules.blacklist import Blacklist # pylint: disable=import-error, no-name-in-module
+
+
+def test_malformed_restrictions_are_skipped():
+    restrictions = Blacklist.compile_restrictions({
+        "users": {"1": {"reason": "spam"}, "not an id": {"reason": "typo"}},
+        "roles": {"2": {}},
+    })
+
+    assert restrictions["users"] == {1}
+    assert restrictions["roles"] == {2}
+    assert restrictions["reasons"] == {("users", 1): "spam", ("roles", 2): None}
+
+
+def test_one_lookup_covers_every_id_type(monkeypatch):
+    blacklist = type(Blacklist)()
+    guild = SimpleNamespace(id=10)
+    lookups = []
+
+    async def get_guild_value(guild, setting):
+        lookups.append(setting)
+
+        return {"roles": {"2": {"reason": "raiders."}}}
+
+    monkeypatch.setattr(blacklist_module, "get_guild_value", get_guild_value)
+
+    loop = asyncio.new_event_loop()
+
+    with pytest.raises(Blacklisted) as exc_info:
+        loop.run_until_complete(blacklist.check_restrictions(guild=guild, users=[1], roles=[3, 2]))
+
+    assert exc_info.value.guild_restriction
+    assert "`raiders`" in exc_info.value.message
+    assert lookups == ["restrictions"]
+
+    loop.close()
@@ -0,0 +1,116 @@
+import asyncio
+
+import pytest
+
+from resources.modules import cache as cache_module # pylint: disable=import-error, no-name-in-module
+from resources.modules.cache import Cache # pylint: disable=import-error, no-name-in-module
+
+
+class FakeCollection:
+    def __init__(self, bulk_write):
+        self.bulk_write = bulk_write
+
+    async def find_one(self, *args, **kwargs):
+        return {}
+
+
+class FakeDatabase:
+    def __init__(self, bulk_write):
+        self.collection = FakeCollection(bulk_write)
+
+    def __getitem__(self, name):
+        return self.collection
+
+
+def test_failed_flush_requeues_writes():
+    cache = type(Cache)()
+
+    async def bulk_write(operations, ordered=True):
+        # a newer change arrives while the flush is running
+        cache.queue_write("guilds", 1, {"hasBot": False}, {})
+
+        raise ConnectionError("mongo went away")
+
+    cache.db = FakeDatabase(bulk_write)
+    cache.queue_write("guilds", 1, {"hasBot": True, "proBot": True}, {})
+
+    loop = asyncio.new_event_loop()
+
+    with pytest.raises(ConnectionError):
+        loop.run_until_complete(cache.flush_writes())
+
+    assert cache.pending_writes[("guilds", "1")] == {"$set": {"hasBot": False, "proBot": True}, "$unset": {}}
+    assert not cache.inflight_writes
+
+    loop.close()
+
+
+def test_reads_see_writes_being_flushed():
+    cache = type(Cache)()
+    loop = asyncio.new_event_loop()
+    writing = asyncio.Event()
+    written = asyncio.Event()
+
+    async def bulk_write(operations, ordered=True):
+        writing.set()
+        await written.wait()
+
+    async def read_during_flush():
+        flush = loop.create_task(cache.flush_writes())
+        await writing.wait()
+
+        guild_data = await cache.get_db_value("guilds", 1)
+
+        written.set()
+        await flush
+
+        return guild_data
+
+    cache.db = FakeDatabase(bulk_write)
+    cache.queue_write("guilds", 1, {"hasBot": True}, {})
+
+    assert loop.run_until_complete(read_during_flush()) == {"hasBot": True}
+    assert not cache.pending_writes
+    assert not cache.inflight_writes
+
+    loop.close()
+
+
+def test_full_queue_flushes_in_the_background(monkeypatch):
+    cache = type(Cache)()
+    loop = asyncio.new_event_loop()
+
+    async def bulk_write(operations, ordered=True):
+        raise ConnectionError("mongo went away")
+
+    monkeypatch.setattr(cache_module, "WRITE_BEHIND_BATCH_SIZE", 1)
+    monkeypatch.setattr(cache_module.Bloxlink, "log", lambda *args, **kwargs: None)
+    cache.db = FakeDatabase(bulk_write)
+    cache.loop = loop
+
+    async def write():
+        # the failed flush must not surface here, since this write was only queued
+        await cache.set_db_value("guilds", 1, hasBot=True)
+        await cache.flush_task
+
+    loop.run_until_complete(write())
+
+    assert cache.pending_writes[("guilds", "1")] == {"$set": {"hasBot": True}, "$unset": {}}
+
+    loop.close()
+
+
+def test_writing_a_setting_calls_its_listeners():
+    cache = type(Cache)()
+    loop = asyncio.new_event_loop()
+    written = []
+
+    cache.on_value_set("guilds", "magicRoles", written.append)
+
+    loop.run_until_complete(cache.set_db_value("guilds", 1, skip_db=True, prefix="?"))
+    assert not written
+
+    loop.run_until_complete(cache.set_db_value("guilds", 1, skip_db=True, magicRoles={}))
+    assert written == [1]
+
+    loop.close()
@@ -0,0 +1,107 @@
+import asyncio
+from types import SimpleNamespace
+
+from resources.structures import DatabaseProfiler as profiler_module # pylint: disable=import-error, no-name-in-module
+from resources.structures.DatabaseProfiler import DatabaseProfiler, ProfiledDatabase # pylint: disable=import-error, no-name-in-module
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def perf_counter(self):
+        return self.now
+
+
+class FakeCursor:
+    def __init__(self, clock, documents):
+        self.clock = clock
+        self.documents = documents
+
+    async def to_list(self, length=None):
+        self.clock.now += 0.5
+
+        return self.documents[:length]
+
+
+class FakeCollection:
+    """a motor-like collection where every query takes a fixed time on the fake clock"""
+
+    def __init__(self, name, clock, indexes):
+        self.name = name
+        self.clock = clock
+        self.indexes = indexes
+
+    async def find_one(self, query_filter, projection=None):
+        self.clock.now += 0.25 if "_id" in query_filter else 2
+
+        return {"_id": "1"} if "_id" in query_filter else None
+
+    async def update_one(self, query_filter, update, upsert=False):
+        self.clock.now += 1
+
+        return SimpleNamespace(matched_count=1)
+
+    def find(self, query_filter, projection=None):
+        return FakeCursor(self.clock, [{"_id": "1"}, {"_id": "2"}, {"_id": "3"}])
+
+    async def index_information(self):
+        return self.indexes
+
+
+class FakeDatabase:
+    def __init__(self, clock):
+        self.collections = {
+            "guilds": FakeCollection("guilds", clock, {"_id_": {"key": [("_id", 1)]}}),
+            "users": FakeCollection("users", clock, {"_id_": {"key": [("_id", 1)]}, "robloxID_1": {"key": [("robloxID", 1)]}}),
+        }
+
+    def __getitem__(self, name):
+        return self.collections[name]
+
+
+def test_queries_are_timed_and_grouped_by_shape(monkeypatch):
+    clock = FakeClock()
+    profiler = DatabaseProfiler()
+    db = ProfiledDatabase(FakeDatabase(clock), profiler)
+
+    monkeypatch.setattr(profiler_module.time, "perf_counter", clock.perf_counter)
+
+    async def run_queries():
+        for guild_id in ("1", "2", "3"):
+            await db.guilds.find_one({"_id": guild_id}, {"prefix": 1})
+
+        await db.guilds.find_one({"hasBot": True})
+        await db["guilds"].update_one({"_id": "1"}, {"$set": {"hasBot": True}})
+        await db.users.find({"robloxID": "1"}).to_list(None)
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(run_queries())
+
+    shapes = profiler.top_shapes()
+
+    # sorted by total time: 2s, 1s, 0.75s over three lookups, 0.5s
+    assert [(shape["collection"], shape["op"], shape["filter"]) for shape in shapes] == [
+        ("guilds", "find_one", ["hasBot"]),
+        ("guilds", "update_one", ["_id"]),
+        ("guilds", "find_one", ["_id"]),
+        ("users", "find", ["robloxID"]),
+    ]
+
+    by_id = shapes[2]
+    assert by_id["projection"] == ["prefix"]
+    assert by_id["count"] == 3
+    assert by_id["total_ms"] == 750
+    assert by_id["p50_ms"] == 250
+    assert by_id["avg_documents"] == 1
+
+    assert shapes[3]["avg_documents"] == 3
+
+    # only the guilds filter on hasBot isn't covered by an index
+    suggestions = loop.run_until_complete(profiler.suggest_indexes(db))
+    assert [suggestion["suggested_index"] for suggestion in suggestions] == [["hasBot"]]
+
+    profiler.reset()
+    assert not profiler.top_shapes()
+
+    loop.close()
@@ -0,0 +1,35 @@
+import asyncio
+from types import SimpleNamespace
+
+from resources.modules.extras import Extras # pylint: disable=import-error, no-name-in-module
+
+
+def make_guild():
+    roles = [SimpleNamespace(id=1, name="Bloxlink Admin"), SimpleNamespace(id=2, name="Moderators")]
+
+    return SimpleNamespace(id=10, roles=roles)
+
+
+def test_magic_role_index_is_reused():
+    extras = type(Extras)()
+    guild = make_guild()
+    author = SimpleNamespace(_roles=[2])
+    builds = []
+
+    build_magic_role_index = extras.build_magic_role_index
+    extras.build_magic_role_index = lambda *args: builds.append(args) or build_magic_role_index(*args)
+
+    loop = asyncio.new_event_loop()
+
+    assert loop.run_until_complete(extras.has_magic_role(author, guild, "Bloxlink Updater", magic_roles_data={"2": ["Bloxlink Updater"]}))
+    assert loop.run_until_complete(extras.has_magic_role(author, guild, "Bloxlink Updater", magic_roles_data={"2": ["Bloxlink Updater"]}))
+
+    assert len(builds) == 1
+
+    # writing the setting drops the index, so the next check rebuilds it
+    extras.clear_magic_roles(guild)
+
+    assert not loop.run_until_complete(extras.has_magic_role(author, guild, "Bloxlink Updater", magic_roles_data={"2": ["Bloxlink Admin"]}))
+    assert len(builds) == 2
+
+    loop.close()
@@ -0,0 +1,19 @@
+from resources.modules import ratelimits # pylint: disable=import-error, no-name-in-module
+
+
+def test_bucket_paces_waiters(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(ratelimits.time, "monotonic", lambda: clock[0])
+
+    bucket = ratelimits.RouteBucket(10, 10)
+    sent = []
+
+    # the worker sends one request at a time, sleeping for each delay
+    for _ in range(40):
+        clock[0] += bucket.delay()
+        sent.append(clock[0])
+
+    assert len([t for t in sent if t < 10]) <= 20
+
+    for earlier, later in zip(sent[10:], sent[11:]):
+        assert later - earlier >= 1 - 1e-9